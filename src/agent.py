@@ -1,7 +1,88 @@
+import hashlib
+import logging
+import threading
+import time
 import requests
-from .config import IMPORTANT_CATEGORIES
+from requests.adapters import HTTPAdapter
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from .config import (
+    IMPORTANT_CATEGORIES, TELEGRAM_MAX_MESSAGES_PER_SECOND, TELEGRAM_NOTIFY_WORKERS,
+    TELEGRAM_REQUEST_TIMEOUT, PROCESSED_IDS_LOOKBACK_HOURS
+)
 from .analytics_db import get_analytics_db
 
+logger = logging.getLogger(__name__)
+
+# Gmail accepts at most 1000 message IDs per batchModify call
+BATCH_MODIFY_LIMIT = 1000
+
+
+def _email_fingerprint(email) -> str:
+    """Stable key for an email's classification input (sender, subject, snippet)"""
+    text = f"{email.get('from', '')}|{email.get('subject', '')}|{email.get('snippet', '')[:256]}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def create_telegram_session() -> requests.Session:
+    """HTTPS session whose pooled keep-alive connections are reused for Telegram Bot API calls"""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=TELEGRAM_NOTIFY_WORKERS * 2))
+    return session
+
+
+# Global Telegram session, shared by every agent created in this process
+_telegram_session = None
+_telegram_session_lock = threading.Lock()
+
+def get_telegram_session() -> requests.Session:
+    """Get or create the shared Telegram session"""
+    global _telegram_session
+    if _telegram_session is None:
+        with _telegram_session_lock:
+            if _telegram_session is None:
+                _telegram_session = create_telegram_session()
+    return _telegram_session
+
+
+# Global Telegram notification pool, shared by every agent so restarts don't leak threads
+_telegram_pool = None
+_telegram_pool_lock = threading.Lock()
+
+def get_telegram_pool() -> ThreadPoolExecutor:
+    """Get or create the shared Telegram notification pool"""
+    global _telegram_pool
+    if _telegram_pool is None:
+        with _telegram_pool_lock:
+            if _telegram_pool is None:
+                _telegram_pool = ThreadPoolExecutor(max_workers=TELEGRAM_NOTIFY_WORKERS,
+                                                    thread_name_prefix="telegram-notify")
+    return _telegram_pool
+
+
+class RateLimiter:
+    """Thread-safe sliding-window limiter allowing `rate` calls per `per` seconds"""
+
+    def __init__(self, rate: int, per: float = 1.0):
+        self.rate = rate
+        self.per = per
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until another call is allowed"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.per:
+                    self._calls.popleft()
+                if len(self._calls) < self.rate:
+                    self._calls.append(now)
+                    return
+                delay = self.per - (now - self._calls[0])
+            time.sleep(delay)
+
+
 class GmailLLMAgent:
     """
     Fetch emails from Gmail Classifier, classify them using LLM Class, 
@@ -9,12 +90,19 @@ class GmailLLMAgent:
 
     """
 
-    def __init__(self, telegram_token: str, chat_id: str, gmail_handler, categorizer):
+    def __init__(self, telegram_token: str, chat_id: str, gmail_handler, categorizer, http_session=None):
         self.gmail = gmail_handler
         self.categorizer = categorizer
         self.telegram_token = telegram_token
         self.chat_id = chat_id
         self.IMPORTANT_CATEGORIES = IMPORTANT_CATEGORIES
+        self._label_cache = None  # {lowercase label name: label id}
+        self.stop_requested = threading.Event()  # set to end process_emails after the current batch
+
+        # Telegram notifications are sent off the labeling path, within Telegram's rate limit
+        self.http = http_session or create_telegram_session()
+        self._tg_pool = get_telegram_pool()
+        self._tg_limiter = RateLimiter(rate=TELEGRAM_MAX_MESSAGES_PER_SECOND, per=1.0)
         
         # Initialize analytics database
         try:
@@ -23,75 +111,195 @@ class GmailLLMAgent:
             print(f"Warning: Could not initialize analytics database: {e}")
             self.analytics_db = None
 
+        # {message id: time processed} for emails already labeled, skipped on later polls.
+        # Seeded from the analytics DB so a restart doesn't reprocess the polling window.
+        self.processed_ids = {}
+        if self.analytics_db:
+            try:
+                now = time.time()
+                self.processed_ids = dict.fromkeys(
+                    self.analytics_db.get_recent_email_ids(hours=PROCESSED_IDS_LOOKBACK_HOURS), now)
+            except Exception as e:
+                print(f"Warning: Could not load processed email IDs: {e}")
+
     def process_emails(self, hours: int = 24, max_results: int = 5, unread_only: bool = False):
             """
             Fetch emails from the last 'hours' hours, classify, label them,
             and send Telegram notifications for important categories.
+            Each fetched batch is processed before the next one is requested.
             """
-            emails = self.gmail.get_emails_since(hours=hours, max_results=max_results, unread_only=unread_only)
-            if not emails:
+            self._prune_processed_ids(hours)
+            processed = 0
+            for emails in self.gmail.iter_emails_since(hours=hours, max_results=max_results, unread_only=unread_only,
+                                                       skip_ids=self.processed_ids):
+                if self.stop_requested.is_set():
+                    print("[INFO] Stop requested, leaving the remaining emails for the next run.")
+                    return
+                print(f"Processing {len(emails)} emails...\n")
+                self._process_batch(emails)
+                processed += len(emails)
+
+            if not processed:
                 print("No emails to process.")
-                return
-
-            print(f"Processing {len(emails)} emails...\n")
-
-            # 1️⃣ Classify emails
-            categorized_emails = self.categorizer.categorize(emails)
-
-            # 2️⃣ Apply labels and check for important emails
-            for email in categorized_emails:
-                category_key = email.get("category", "uncategorized")
-                label_name = email.get("category_label", "Other 📧")
-
-                # create label if not exists
-                if not self.gmail.check_label_exists(label_name):
-                    self.gmail.create_label(label_name)
-
-                # apply label
-                try:
-                    self.gmail.service.users().messages().modify(
-                        userId='me',
-                        id=email['id'],
-                        body={'addLabelIds': [self._get_label_id(label_name)],
-                            'removeLabelIds': []}  # optional: remove UNREAD
-                    ).execute()
-                    try:
-                        print(f"Labeled: {email['subject'][:50]} -> {label_name}")
-                    except UnicodeEncodeError:
-                        print(f"Labeled: {email['subject'][:50].encode('ascii', 'replace').decode('ascii')} -> {label_name.encode('ascii', 'replace').decode('ascii')}")
-                except Exception as e:
-                    print(f"Error applying label to '{email['subject']}': {e}")
-                
-                # 📊 Record to analytics database
-                if self.analytics_db:
-                    try:
-                        self.analytics_db.record_email(
-                            email_id=email['id'],
-                            subject=email.get('subject', ''),
-                            sender=email.get('from', ''),
-                            category=category_key,
-                            category_label=label_name,
-                            is_important=category_key in self.IMPORTANT_CATEGORIES,
-                            snippet=email.get('snippet', ''),
-                            thread_id=email.get('threadId')
-                        )
-                    except Exception as e:
-                        print(f"Warning: Could not record email to analytics: {e}")
-
-                # 3️⃣ Send Telegram notification if important
-                if category_key in self.IMPORTANT_CATEGORIES and self.telegram_token and self.chat_id:
-                    self.send_telegram_notification(email)
 
+    def _prune_processed_ids(self, hours: int):
+        """Forget IDs processed more than 'hours' ago; those emails are outside the polling window"""
+        cutoff = time.time() - hours * 3600
+        self.processed_ids = {msg_id: seen for msg_id, seen in self.processed_ids.items() if seen >= cutoff}
+
+    def _process_batch(self, emails):
+        """Classify, label, record and notify one batch of fetched emails"""
+        # 1️⃣ Classify emails (reusing cached classifications where possible)
+        categorized_emails = self._categorize_with_cache(emails)
+
+        # 2️⃣ Group emails by label so each label costs one batchModify call
+        self._refresh_label_cache()
+        label_groups = defaultdict(list)
+        for email in categorized_emails:
+            label_name = email.get("category_label", "Other 📧")
+            label_id = self._get_label_id(label_name)
+            if not label_id:
+                print(f"Error applying label to '{email['subject']}': could not create label")
+                continue
+            label_groups[(label_id, label_name)].append(email)
+
+        labeled_ids = set()
+        for (label_id, label_name), group in label_groups.items():
+            labeled_ids.update(self._apply_label(label_id, label_name, group))
+
+        # 3️⃣ Collect analytics rows and check for important emails.
+        # Emails that couldn't be labeled are left out so the next poll retries them.
+        notifications = []
+        analytics_rows = []
+        labeled_emails = [email for email in categorized_emails if email['id'] in labeled_ids]
+        for email in labeled_emails:
+            category_key = email.get("category", "uncategorized")
+            label_name = email.get("category_label", "Other 📧")
+
+            analytics_rows.append((
+                email['id'],
+                email.get('subject', ''),
+                email.get('from', ''),
+                category_key,
+                label_name,
+                category_key in self.IMPORTANT_CATEGORIES,
+                email.get('snippet', ''),
+                email.get('threadId')
+            ))
+
+            # 4️⃣ Send Telegram notification if important
+            if category_key in self.IMPORTANT_CATEGORIES and self.telegram_token and self.chat_id:
+                notifications.append(self._tg_pool.submit(self._send_with_limit, email))
+
+        now = time.time()
+        self.processed_ids.update((email['id'], now) for email in labeled_emails)
+
+        # 📊 Record to analytics database in one transaction
+        if self.analytics_db and not self.analytics_db.record_emails_bulk(analytics_rows):
+            print("Warning: Could not record emails to analytics")
+
+        wait(notifications)
+
+    def _categorize_with_cache(self, emails):
+        """Serve previously seen emails from the classification cache and classify the rest"""
+        if not self.analytics_db:
+            return self.categorizer.categorize_batch(emails)
+
+        keys = {email['id']: _email_fingerprint(email) for email in emails}
+        try:
+            cached = self.analytics_db.get_cached_classifications(list(keys.values()))
+        except Exception as e:
+            print(f"Warning: Could not read classification cache: {e}")
+            cached = {}
+
+        hits, misses = [], []
+        for email in emails:
+            hit = cached.get(keys[email['id']])
+            if hit:
+                email["category"], email["category_label"] = hit
+                hits.append(email)
+            else:
+                misses.append(email)
+
+        if hits:
+            print(f"Reusing cached classification for {len(hits)} emails")
+
+        classified = self.categorizer.categorize_batch(misses) if misses else []
+        # Don't pin the fallback from a failed or unparseable LLM answer; the next run gets another try
+        self.analytics_db.cache_classifications([
+            (keys[email['id']], email["category"], email["category_label"],
+             email["category"] in self.IMPORTANT_CATEGORIES)
+            for email in classified
+            if email["category"] != "uncategorized"
+        ])
+        return hits + classified
+
+    def _apply_label(self, label_id: str, label_name: str, emails):
+        """
+        Apply one label to a group of emails using batchModify,
+        falling back to per-message modify if a batch fails.
+        Returns the IDs of the emails that were labeled.
+        """
+        messages = self.gmail.service.users().messages()
+        labeled = []
+        for start in range(0, len(emails), BATCH_MODIFY_LIMIT):
+            chunk = emails[start:start + BATCH_MODIFY_LIMIT]
+            try:
+                messages.batchModify(
+                    userId='me',
+                    body={'ids': [email['id'] for email in chunk],
+                          'addLabelIds': [label_id],
+                          'removeLabelIds': []}
+                ).execute()
+            except Exception as e:
+                print(f"Batch labeling failed for {len(chunk)} emails, retrying one by one: {e}")
+                labeled.extend(self._apply_label_individually(label_id, label_name, chunk))
+            else:
+                for email in chunk:
+                    logger.info("Labeled: %s -> %s", email['subject'][:50], label_name)
+                labeled.extend(email['id'] for email in chunk)
+        return labeled
+
+    def _apply_label_individually(self, label_id: str, label_name: str, emails):
+        """Fallback: apply a label one message at a time, returning the IDs that succeeded"""
+        messages = self.gmail.service.users().messages()
+        labeled = []
+        for email in emails:
+            try:
+                messages.modify(
+                    userId='me',
+                    id=email['id'],
+                    body={'addLabelIds': [label_id],
+                          'removeLabelIds': []}  # optional: remove UNREAD
+                ).execute()
+                logger.info("Labeled: %s -> %s", email['subject'][:50], label_name)
+                labeled.append(email['id'])
+            except Exception as e:
+                print(f"Error applying label to '{email['subject']}': {e}")
+        return labeled
+
+    def _refresh_label_cache(self):
+        """Fetch user labels once and cache them as {lowercase name: id}"""
+        self._label_cache = {label['name'].lower(): label['id'] for label in self.gmail.get_labels()}
 
     def _get_label_id(self, label_name: str):
         """Return Gmail label ID, create if it doesn't exist"""
-        labels = self.gmail.get_labels()
-        for label in labels:
-            if label['name'].lower() == label_name.lower():
-                return label['id']
+        if self._label_cache is None:
+            self._refresh_label_cache()
+        label_id = self._label_cache.get(label_name.lower())
+        if label_id:
+            return label_id
         # create if not found
         label = self.gmail.create_label(label_name)
-        return label['id'] if label else None
+        if not label:
+            return None
+        self._label_cache[label_name.lower()] = label['id']
+        return label['id']
+
+    def _send_with_limit(self, email):
+        """Send a Telegram notification once the rate limiter allows it"""
+        self._tg_limiter.acquire()
+        self.send_telegram_notification(email)
 
     def send_telegram_notification(self, email):
         """Send a Telegram message with the email subject and snippet"""
@@ -108,12 +316,9 @@ class GmailLLMAgent:
             }
         }
         try:
-            response = requests.post(url, data=payload)
+            response = self.http.post(url, data=payload, timeout=TELEGRAM_REQUEST_TIMEOUT)
             if response.status_code == 200:
-                try:
-                    print(f"Telegram notification sent for '{email.get('subject','')[:50]}'")
-                except UnicodeEncodeError:
-                    print(f"Telegram notification sent for '{email.get('subject','').encode('ascii', 'replace').decode('ascii')[:50]}'")
+                print(f"Telegram notification sent for '{email.get('subject','')[:50]}'")
             else:
                 print(f"Failed to send Telegram message: {response.text}")
         except Exception as e:
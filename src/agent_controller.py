@@ -2,54 +2,57 @@
 Shared agent controller for managing the email agent state.
 This module is used by both the FastAPI API and Telegram bot.
 """
-import threading
+import asyncio
+import logging
 import time
-from src.main import run_polling_loop
+from src.main import async_polling_loop
+
+logger = logging.getLogger(__name__)
 
 # Global Agent State
-agent_thread = None
-stop_event = None
+agent_task = None
 agent_status = "Stopped"
 last_run_time = "Never"
+_run_listeners = []  # callables notified with the timestamp of every processing run
 
 def start_agent(mode="monitor"):
     """
-    Start the email agent in a background thread
+    Start the email agent as a task on the running event loop
     
     Args:
         mode: "monitor" (default) or "backfill"
     """
-    global agent_thread, stop_event, agent_status, last_run_time
+    global agent_task, agent_status
     
-    if agent_thread and agent_thread.is_alive():
+    if agent_task and not agent_task.done():
         return {"success": False, "message": "Agent is already running"}
     
-    stop_event = threading.Event()
-    agent_thread = threading.Thread(target=_run_agent_wrapper, args=(stop_event, mode))
-    agent_thread.start()
+    agent_task = asyncio.get_running_loop().create_task(_run_agent_wrapper(mode))
     agent_status = "Running"
     
     return {"success": True, "message": f"Agent started successfully (Mode: {mode})"}
 
-def stop_agent():
-    """Stop the email agent"""
-    global agent_thread, stop_event, agent_status
+async def stop_agent():
+    """Stop the email agent by cancelling its task and waiting for it to finish"""
+    global agent_task, agent_status
     
-    if not agent_thread or not agent_thread.is_alive():
+    if not agent_task or agent_task.done():
         return {"success": False, "message": "Agent is not running"}
     
-    if stop_event:
-        stop_event.set()
-    
-    agent_status = "Stopping..."
-    return {"success": True, "message": "Agent stopping..."}
+    # A cycle already running in its worker thread stops after its current batch,
+    # and the task only finishes once it has, so a restart can't overlap it
+    agent_task.cancel()
+    await asyncio.wait([agent_task])
+    agent_task = None
+    agent_status = "Stopped"
+    return {"success": True, "message": "Agent stopped"}
 
 def get_agent_status():
     """Get the current agent status"""
-    global agent_status, last_run_time, agent_thread
+    global agent_status
     
-    # Update status if thread finished naturally
-    if agent_thread and not agent_thread.is_alive() and agent_status == "Running":
+    # Update status if the task finished naturally
+    if agent_task and agent_task.done() and agent_status == "Running":
         agent_status = "Stopped"
     
     return {
@@ -57,13 +60,39 @@ def get_agent_status():
         "last_run": last_run_time
     }
 
-def _run_agent_wrapper(event, mode="monitor"):
-    """Wrapper function to run the agent with error handling"""
-    global agent_status, last_run_time
+async def wait_for_agent(timeout=None):
+    """
+    Wait for the agent task to finish without cancelling it
+    
+    Args:
+        timeout: Seconds to wait, or None to wait indefinitely
+    
+    Returns:
+        True if the agent is stopped, False if it was still running at the timeout
+    """
+    if agent_task and not agent_task.done():
+        await asyncio.wait([agent_task], timeout=timeout)
+    return get_agent_status()["status"] == "Stopped"
+
+def add_run_listener(callback):
+    """Call callback(last_run_time) at the start of every processing run"""
+    _run_listeners.append(callback)
+
+def _record_run():
+    """Update the last run timestamp; called by the polling loop once per cycle"""
+    global last_run_time
+    last_run_time = time.strftime("%Y-%m-%d %H:%M:%S")
+    for callback in _run_listeners:
+        callback(last_run_time)
+
+async def _run_agent_wrapper(mode="monitor"):
+    """Wrapper coroutine to run the agent with error handling"""
+    global agent_status
     try:
-        last_run_time = time.strftime("%Y-%m-%d %H:%M:%S")
-        run_polling_loop(stop_event=event, initial_mode=mode)
-    except Exception as e:
-        print(f"Agent thread error: {e}")
+        await async_polling_loop(initial_mode=mode, tick_cb=_record_run)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Agent task error")
     finally:
         agent_status = "Stopped"
@@ -3,18 +3,28 @@ Analytics database module for tracking email classification history.
 Uses SQLite to store email metadata and provide analytics queries.
 """
 import sqlite3
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 import os
 
 
 class AnalyticsDB:
     """Database handler for email analytics tracking"""
     
+    # Kept constant so sqlite3's statement cache reuses the compiled INSERT
+    _INSERT_SQL = """
+        INSERT OR REPLACE INTO emails 
+        (id, subject, sender, category, category_label, is_important, snippet, thread_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
     def __init__(self, db_path: str = "analytics.db"):
         """Initialize database connection and create tables if needed"""
         self.db_path = db_path
         self.conn = None
+        self._lock = threading.Lock()  # sqlite3 connections aren't safe for concurrent writes
+        self.write_version = 0  # bumped on every emails write so readers can invalidate caches
         self._connect()
         self._initialize_schema()
     
@@ -22,6 +32,13 @@ class AnalyticsDB:
         """Establish database connection"""
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
+        
+        # WAL lets analytics reads proceed while the agent thread is writing
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_size=-65536")
     
     def _initialize_schema(self):
         """Create tables if they don't exist"""
@@ -42,10 +59,24 @@ class AnalyticsDB:
             )
         """)
         
-        # Index for faster queries
+        # Composite indexes covering the time-window + group-by queries.
+        # (timestamp, ...) prefixes make separate timestamp/is_important indexes redundant.
+        cursor.execute("DROP INDEX IF EXISTS idx_timestamp")
+        cursor.execute("DROP INDEX IF EXISTS idx_important")
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ts_cat 
+            ON emails(timestamp, category_label)
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ts_imp 
+            ON emails(timestamp, is_important)
+        """)
+        
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_timestamp 
-            ON emails(timestamp)
+            CREATE INDEX IF NOT EXISTS idx_ts_sender 
+            ON emails(timestamp, sender)
         """)
         
         cursor.execute("""
@@ -53,11 +84,21 @@ class AnalyticsDB:
             ON emails(category)
         """)
         
+        # Classification cache: email fingerprint -> category, so repeat emails skip the LLM
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_important 
-            ON emails(is_important)
+            CREATE TABLE IF NOT EXISTS classification_cache (
+                key TEXT PRIMARY KEY,
+                category TEXT,
+                category_label TEXT,
+                is_important BOOLEAN
+            )
         """)
         
+        # Gather planner statistics once so the composite indexes get picked
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
+        
         self.conn.commit()
     
     def record_email(self, email_id: str, subject: str, sender: str, 
@@ -80,19 +121,103 @@ class AnalyticsDB:
             True if successful, False otherwise
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO emails 
-                (id, subject, sender, category, category_label, is_important, snippet, thread_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (email_id, subject, sender, category, category_label, 
-                  is_important, snippet, thread_id))
-            self.conn.commit()
+            with self._lock:
+                self.conn.execute(self._INSERT_SQL, (email_id, subject, sender, category, category_label,
+                                                     is_important, snippet, thread_id))
+                self.conn.commit()
+                self.write_version += 1
             return True
         except Exception as e:
             print(f"Error recording email to analytics DB: {e}")
             return False
     
+    def record_emails_bulk(self, rows: List[Tuple]) -> bool:
+        """
+        Record many classified emails with a single commit
+        
+        Args:
+            rows: List of (email_id, subject, sender, category, category_label,
+                  is_important, snippet, thread_id) tuples
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not rows:
+            return True
+        try:
+            with self._lock, self.conn:
+                self.conn.executemany(self._INSERT_SQL, rows)
+                self.write_version += 1
+            return True
+        except Exception as e:
+            print(f"Error recording emails to analytics DB: {e}")
+            return False
+    
+    def get_cached_classifications(self, keys: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Look up cached classifications for a set of email fingerprints
+        
+        Args:
+            keys: Email fingerprints
+            
+        Returns:
+            Dictionary mapping fingerprint to (category, category_label)
+        """
+        if not keys:
+            return {}
+        
+        cursor = self.conn.cursor()
+        placeholders = ", ".join("?" for _ in keys)
+        cursor.execute(f"""
+            SELECT key, category, category_label FROM classification_cache
+            WHERE key IN ({placeholders})
+        """, list(keys))
+        
+        return {row['key']: (row['category'], row['category_label']) for row in cursor.fetchall()}
+    
+    def cache_classifications(self, entries: List[Tuple[str, str, str, bool]]) -> bool:
+        """
+        Store classifications for later reuse
+        
+        Args:
+            entries: List of (fingerprint, category, category_label, is_important) tuples
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not entries:
+            return True
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO classification_cache
+                    (key, category, category_label, is_important)
+                    VALUES (?, ?, ?, ?)
+                """, entries)
+                self.conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error caching classifications: {e}")
+            return False
+    
+    def get_recent_email_ids(self, hours: int = 48) -> Set[str]:
+        """
+        Get the IDs of emails recorded in the last N hours
+        
+        Args:
+            hours: Number of hours to look back
+            
+        Returns:
+            Set of Gmail message IDs
+        """
+        cursor = self.conn.cursor()
+        cutoff_date = datetime.now() - timedelta(hours=hours)
+        
+        cursor.execute("SELECT id FROM emails WHERE timestamp >= ?", (cutoff_date,))
+        
+        return {row['id'] for row in cursor.fetchall()}
+    
     def get_emails_by_date_range(self, days: int = 30) -> List[Dict]:
         """
         Get all emails from the last N days
@@ -160,6 +285,39 @@ class AnalyticsDB:
         
         return [(row['date'], row['count']) for row in cursor.fetchall()]
     
+    def get_daily_volume_filled(self, days: int = 30) -> List[Tuple[str, int]]:
+        """
+        Get daily email volume for the last N days, including zero-count days
+        
+        Args:
+            days: Number of days to look back
+            
+        Returns:
+            List of (date, count) tuples covering every day in the window, oldest first
+        """
+        cursor = self.conn.cursor()
+        now = datetime.now()
+        cutoff_date = now - timedelta(days=days)
+        
+        cursor.execute("""
+            WITH RECURSIVE dates(d) AS (
+                SELECT ?
+                UNION ALL
+                SELECT DATE(d, '+1 day') FROM dates WHERE d < ?
+            ),
+            counts AS (
+                SELECT DATE(timestamp) as d, COUNT(*) as count
+                FROM emails
+                WHERE timestamp >= ?
+                GROUP BY DATE(timestamp)
+            )
+            SELECT dates.d as date, COALESCE(counts.count, 0) as count
+            FROM dates LEFT JOIN counts ON counts.d = dates.d
+            ORDER BY dates.d ASC
+        """, (cutoff_date.strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d'), cutoff_date))
+        
+        return [(row['date'], row['count']) for row in cursor.fetchall()]
+    
     def get_daily_volume_by_category(self, days: int = 30) -> Dict[str, List[Tuple[str, int]]]:
         """
         Get daily email volume broken down by category
@@ -234,6 +392,64 @@ class AnalyticsDB:
             'by_category': by_category
         }
     
+    def get_summary_counts(self, days: int = 30) -> Dict[str, int]:
+        """
+        Get period total, important and all-time counts in a single scan
+        
+        Args:
+            days: Number of days to look back
+            
+        Returns:
+            Dictionary with 'total', 'important' and 'all_time' counts
+        """
+        cursor = self.conn.cursor()
+        cutoff_date = datetime.now() - timedelta(days=days)
+        
+        cursor.execute("""
+            SELECT COUNT(*) as all_time,
+                   COALESCE(SUM(timestamp >= ?), 0) as total,
+                   COALESCE(SUM(timestamp >= ? AND is_important = 1), 0) as important
+            FROM emails
+        """, (cutoff_date, cutoff_date))
+        row = cursor.fetchone()
+        
+        return {
+            'total': row['total'],
+            'important': row['important'],
+            'all_time': row['all_time']
+        }
+    
+    def get_peak_activity(self, days: int = 30) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """
+        Get email counts bucketed by day of week and by hour of day
+        
+        Args:
+            days: Number of days to look back
+            
+        Returns:
+            Tuple of ({weekday: count}, {hour: count}), weekday 0 = Sunday
+        """
+        cursor = self.conn.cursor()
+        cutoff_date = datetime.now() - timedelta(days=days)
+        
+        cursor.execute("""
+            SELECT CAST(strftime('%w', timestamp) AS INTEGER) as dow, COUNT(*) as count
+            FROM emails
+            WHERE timestamp >= ? AND dow IS NOT NULL
+            GROUP BY dow
+        """, (cutoff_date,))
+        day_counts = {row['dow']: row['count'] for row in cursor.fetchall()}
+        
+        cursor.execute("""
+            SELECT CAST(strftime('%H', timestamp) AS INTEGER) as hour, COUNT(*) as count
+            FROM emails
+            WHERE timestamp >= ? AND hour IS NOT NULL
+            GROUP BY hour
+        """, (cutoff_date,))
+        hour_counts = {row['hour']: row['count'] for row in cursor.fetchall()}
+        
+        return day_counts, hour_counts
+    
     def get_top_senders(self, days: int = 30, limit: int = 10) -> List[Tuple[str, int]]:
         """
         Get top email senders by volume
@@ -1,10 +1,49 @@
 """
 Analytics engine for computing insights and trends from email data.
 """
-from datetime import datetime, timedelta
+import time
+from collections import Counter, defaultdict
+from functools import wraps
 from typing import Dict, List, Optional
 from .analytics_db import get_analytics_db
-from .config import JOB_CATEGORIES
+from .config import JOB_CATEGORIES, ANALYTICS_CACHE_TTL
+
+WEEKDAY_NAMES = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+# Category key -> success metric it contributes to
+SUCCESS_METRIC_CATEGORIES = {
+    'application_confirmed': 'applications',
+    'interview_request': 'interviews',
+    'interview_reminder': 'interviews',
+    'offer': 'offers',
+    'rejected': 'rejections',
+    'assessment': 'assessments',
+}
+
+_CACHE_MAXSIZE = 64
+
+
+def _ttl_cached(method):
+    """
+    Cache a days-keyed query for ANALYTICS_CACHE_TTL seconds.
+    The DB write version is part of the key, so new emails invalidate cached results.
+    """
+    @wraps(method)
+    def wrapper(self, days: int = 30):
+        key = (method.__name__, days, self.db.write_version)
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        
+        value = method(self, days)
+        if len(self._cache) >= _CACHE_MAXSIZE:
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            if len(self._cache) >= _CACHE_MAXSIZE:
+                self._cache.clear()
+        self._cache[key] = (now + ANALYTICS_CACHE_TTL, value)
+        return value
+    return wrapper
 
 
 class AnalyticsEngine:
@@ -19,7 +58,15 @@ class AnalyticsEngine:
         """
         self.db = get_analytics_db()
         self.llm = llm
+        self._cache = {}  # {(method, days, db write version): (expires_at, result)}
+        
+        # Map category labels to the success metric they count towards
+        self._label_to_metric = {
+            JOB_CATEGORIES[key]['label']: metric
+            for key, metric in SUCCESS_METRIC_CATEGORIES.items()
+        }
     
+    @_ttl_cached
     def get_summary_statistics(self, days: int = 30) -> Dict:
         """
         Get comprehensive summary statistics
@@ -30,12 +77,13 @@ class AnalyticsEngine:
         Returns:
             Dictionary with summary stats
         """
-        emails = self.db.get_emails_by_date_range(days)
+        counts = self.db.get_summary_counts(days)
         category_counts = self.db.get_category_counts(days)
-        important_stats = self.db.get_important_email_stats(days)
         top_senders = self.db.get_top_senders(days, limit=5)
         
-        total_emails = len(emails)
+        total_emails = counts['total']
+        important_emails = counts['important']
+        important_percentage = (important_emails / total_emails * 100) if total_emails > 0 else 0
         
         # Calculate averages
         avg_per_day = total_emails / days if days > 0 else 0
@@ -50,12 +98,13 @@ class AnalyticsEngine:
             'category_breakdown': category_counts,
             'most_common_category': most_common_category[0],
             'most_common_count': most_common_category[1],
-            'important_emails': important_stats['important_emails'],
-            'important_percentage': round(important_stats['important_percentage'], 1),
+            'important_emails': important_emails,
+            'important_percentage': round(important_percentage, 1),
             'top_senders': top_senders,
-            'all_time_total': self.db.get_total_email_count()
+            'all_time_total': counts['all_time']
         }
     
+    @_ttl_cached
     def get_email_volume_trends(self, days: int = 30) -> Dict:
         """
         Get email volume trends over time
@@ -66,21 +115,9 @@ class AnalyticsEngine:
         Returns:
             Dictionary with trend data
         """
-        daily_volume = self.db.get_daily_volume(days)
+        complete_daily_volume = self.db.get_daily_volume_filled(days)
         daily_by_category = self.db.get_daily_volume_by_category(days)
         
-        # Fill in missing dates with zero counts
-        start_date = datetime.now() - timedelta(days=days)
-        date_range = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days + 1)]
-        
-        # Create complete daily volume with zeros for missing dates
-        volume_dict = {date: 0 for date in date_range}
-        for date, count in daily_volume:
-            if date in volume_dict:
-                volume_dict[date] = count
-        
-        complete_daily_volume = [(date, volume_dict[date]) for date in sorted(volume_dict.keys())]
-        
         # Calculate trend (simple: compare first half vs second half)
         if len(complete_daily_volume) >= 2:
             midpoint = len(complete_daily_volume) // 2
@@ -104,6 +141,7 @@ class AnalyticsEngine:
             'trend_direction': trend_direction
         }
     
+    @_ttl_cached
     def get_category_distribution(self, days: int = 30) -> Dict:
         """
         Get percentage distribution of email categories
@@ -114,28 +152,27 @@ class AnalyticsEngine:
         Returns:
             Dictionary with category percentages
         """
-        category_counts = self.db.get_category_counts(days)
-        total = sum(category_counts.values())
+        counter = Counter(self.db.get_category_counts(days))
+        total = sum(counter.values())
         
         if total == 0:
             return {'categories': {}, 'total': 0}
         
+        # most_common() already yields categories sorted by count, descending
         distribution = {
             category: {
                 'count': count,
                 'percentage': round((count / total) * 100, 1)
             }
-            for category, count in category_counts.items()
+            for category, count in counter.most_common()
         }
         
-        # Sort by count
-        sorted_distribution = dict(sorted(distribution.items(), key=lambda x: x[1]['count'], reverse=True))
-        
         return {
-            'categories': sorted_distribution,
+            'categories': distribution,
             'total': total
         }
     
+    @_ttl_cached
     def get_success_metrics(self, days: int = 30) -> Dict:
         """
         Calculate job search success metrics
@@ -148,20 +185,18 @@ class AnalyticsEngine:
         """
         category_counts = self.db.get_category_counts(days)
         
-        # Map category labels to keys for easier lookup
-        label_to_key = {v['label']: k for k, v in JOB_CATEGORIES.items()}
+        # Bucket counts into success metrics in a single pass
+        buckets = defaultdict(int)
+        for label, count in category_counts.items():
+            metric = self._label_to_metric.get(label)
+            if metric:
+                buckets[metric] += count
         
-        # Get counts for specific categories
-        applications = sum(count for label, count in category_counts.items() 
-                          if label_to_key.get(label) == 'application_confirmed')
-        interviews = sum(count for label, count in category_counts.items() 
-                        if label_to_key.get(label) in ['interview_request', 'interview_reminder'])
-        offers = sum(count for label, count in category_counts.items() 
-                    if label_to_key.get(label) == 'offer')
-        rejections = sum(count for label, count in category_counts.items() 
-                        if label_to_key.get(label) == 'rejected')
-        assessments = sum(count for label, count in category_counts.items() 
-                         if label_to_key.get(label) == 'assessment')
+        applications = buckets['applications']
+        interviews = buckets['interviews']
+        offers = buckets['offers']
+        rejections = buckets['rejections']
+        assessments = buckets['assessments']
         
         # Calculate conversion rates
         interview_rate = (interviews / applications * 100) if applications > 0 else 0
@@ -243,6 +278,7 @@ Be specific, encouraging, and data-driven. Keep it concise (max 200 words).
             lines.append(f"  - {category}: {data['count']} ({data['percentage']}%)")
         return "\n".join(lines) if lines else "  No data"
     
+    @_ttl_cached
     def get_peak_activity_times(self, days: int = 30) -> Dict:
         """
         Identify when most emails are received
@@ -253,26 +289,13 @@ Be specific, encouraging, and data-driven. Keep it concise (max 200 words).
         Returns:
             Dictionary with peak activity analysis
         """
-        emails = self.db.get_emails_by_date_range(days)
+        weekday_counts, hour_counts = self.db.get_peak_activity(days)
         
-        if not emails:
+        if not weekday_counts:
             return {'peak_day': 'N/A', 'peak_hour': 'N/A'}
         
-        # Count by day of week
-        day_counts = {}
-        hour_counts = {}
-        
-        for email in emails:
-            timestamp_str = email['timestamp']
-            try:
-                dt = datetime.fromisoformat(timestamp_str)
-                day_name = dt.strftime('%A')
-                hour = dt.hour
-                
-                day_counts[day_name] = day_counts.get(day_name, 0) + 1
-                hour_counts[hour] = hour_counts.get(hour, 0) + 1
-            except:
-                continue
+        # SQLite's %w numbers weekdays from Sunday = 0
+        day_counts = {WEEKDAY_NAMES[dow]: count for dow, count in weekday_counts.items()}
         
         peak_day = max(day_counts.items(), key=lambda x: x[1])[0] if day_counts else 'N/A'
         peak_hour = max(hour_counts.items(), key=lambda x: x[1])[0] if hour_counts else 'N/A'
@@ -283,3 +306,16 @@ Be specific, encouraging, and data-driven. Keep it concise (max 200 words).
             'day_distribution': day_counts,
             'hour_distribution': hour_counts
         }
+
+
+# Global engine instance
+_engine_instance = None
+
+def get_analytics_engine(llm=None) -> AnalyticsEngine:
+    """Get or create the global analytics engine instance"""
+    global _engine_instance
+    if _engine_instance is None:
+        _engine_instance = AnalyticsEngine(llm)
+    elif llm is not None and _engine_instance.llm is None:
+        _engine_instance.llm = llm
+    return _engine_instance
@@ -2,48 +2,499 @@
 Analytics visualization module for generating charts and graphs.
 Uses matplotlib to create visual representations of email analytics.
 """
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend for server use
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Tuple, Dict
+from typing import Callable, List, Optional, Tuple, Dict
+import asyncio
+import hashlib
+import json
+import multiprocessing
 import os
+import tempfile
 from .analytics_engine import AnalyticsEngine
 from .config import JOB_CATEGORIES
 
+# Number of rendered chart paths remembered per visualizer
+CHART_CACHE_SIZE = 32
+
+# Worker processes used for off-loop chart rendering
+CHART_POOL_WORKERS = os.cpu_count() or 1
+
+# Resolution of saved charts; figures are created at this dpi so
+# print_png can write them without savefig's dpi swap
+CHART_DPI = 150
+
+# zlib level 1 encodes ~1.6x faster for ~20% larger files; charts are
+# sent once to Telegram and then expired by cleanup_old_charts
+FAST_PNG_KWARGS = {'compress_level': 1, 'optimize': False}
+
+# Color scheme matching category labels, shared by every visualizer
+_CATEGORY_COLORS = {
+    'Interview 📅': '#FF6B6B',
+    'Interview Reminder ⏰': '#FFA07A',
+    'Job Offer 🎉': '#4ECDC4',
+    'Applied ✓': '#95E1D3',
+    'Rejected ❌': '#F38181',
+    'Assessment 📝': '#AA96DA',
+    'Follow-up 💬': '#FCBAD3',
+    'Job Alert 🔔': '#FFFFD2',
+    'Newsletter 📰': '#A8E6CF',
+    'Spam 🗑️': '#C7CEEA',
+    'Other 📧': '#DCDCDC'
+}
+
+# Color for labels missing from _CATEGORY_COLORS
+_DEFAULT_COLOR = '#CCCCCC'
+
+_chart_pool = None
+_figures = {}  # {chart name: reusable Agg Figure}, one set per process
+
+
+def _get_chart_pool() -> ProcessPoolExecutor:
+    """Lazily create the process pool shared by all visualizers"""
+    global _chart_pool
+    if _chart_pool is None:
+        # matplotlib isn't thread-safe, so charts render in separate processes.
+        # 'spawn' avoids forking the bot's running threads and event loop.
+        _chart_pool = ProcessPoolExecutor(max_workers=CHART_POOL_WORKERS,
+                                          mp_context=multiprocessing.get_context('spawn'))
+    return _chart_pool
+
+
+def _data_digest(data) -> str:
+    """Short stable hash of the analytics data behind a chart"""
+    payload = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def _get_figure(name: str, figsize: Tuple[int, int]) -> Figure:
+    """
+    Return a cleared, reusable Agg figure for a chart type
+    
+    Args:
+        name: Chart type the figure is reserved for
+        figsize: Figure size in inches, used when the figure is first created
+    
+    Returns:
+        Empty Figure ready for drawing
+    """
+    fig = _figures.get(name)
+    if fig is None:
+        # Build on the Agg canvas directly; pyplot's global figure manager is never touched
+        fig = Figure(figsize=figsize, dpi=CHART_DPI)
+        FigureCanvasAgg(fig)
+        _figures[name] = fig
+    else:
+        fig.clear()
+    return fig
+
+
+def _save_png(fig: Figure, filepath: str, fast_png: bool = True):
+    """
+    Write a figure straight through its Agg canvas, optionally with fast, light compression.
+    The PNG is written to a unique temporary file and moved into place, so a concurrent
+    request for the same chart never reads a half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), prefix='.tmp_', suffix='.png')
+    os.close(fd)
+    try:
+        fig.canvas.print_png(tmp_path, pil_kwargs=FAST_PNG_KWARGS if fast_png else None)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Renderers are top-level functions taking plain data so they can be
+# pickled into the chart process pool as well as called in-process.
+# Each chart's drawing lives in a _plot_* helper that fills a given axes,
+# shared by the single-chart renderers and the dashboard.
+
+def _plot_no_data(ax, message: str, fontsize: int = 16):
+    """Draw a placeholder message on an axes"""
+    ax.text(0.5, 0.5, message, ha='center', va='center',
+            fontsize=fontsize, fontweight='bold', color='gray')
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.axis('off')
+
+
+def _plot_volume_trend(ax, trends: Dict, days: int, colors: Dict[str, str]):
+    """
+    Draw email volume over time on an axes
+    
+    Args:
+        ax: Axes to draw on
+        trends: Result of AnalyticsEngine.get_email_volume_trends
+        days: Number of days visualized
+        colors: Category label to color mapping (unused, shared signature)
+    """
+    daily_volume = trends['daily_volume']
+    
+    if not daily_volume:
+        _plot_no_data(ax, "No email data available")
+        return
+    
+    # Prepare data
+    dates = np.array([date for date, _ in daily_volume], dtype='datetime64[D]')
+    counts = np.fromiter((count for _, count in daily_volume), dtype=np.int32, count=len(daily_volume))
+    
+    # Plot line
+    ax.plot(dates, counts, marker='o', linewidth=2, markersize=6,
+            color='#4ECDC4', label='Daily Emails')
+    
+    # Fill area under curve
+    ax.fill_between(dates, counts, alpha=0.3, color='#4ECDC4')
+    
+    # Formatting
+    ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Number of Emails', fontsize=12, fontweight='bold')
+    ax.set_title(f'Email Volume Trend (Last {days} Days)', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3, linestyle='--')
+    
+    # Format x-axis dates
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
+    ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, days // 10)))
+    ax.tick_params(axis='x', labelrotation=45)
+    
+    # Add trend annotation
+    trend_text = f"Trend: {trends['trend_direction'].title()} ({trends['trend_percentage']:+.1f}%)"
+    ax.text(0.02, 0.98, trend_text, transform=ax.transAxes,
+            fontsize=10, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+
+def _plot_category_pie(ax, distribution: Dict, days: int, colors: Dict[str, str]):
+    """
+    Draw category distribution as a pie on an axes
+    
+    Args:
+        ax: Axes to draw on
+        distribution: Result of AnalyticsEngine.get_category_distribution
+        days: Number of days analyzed
+        colors: Category label to color mapping
+    """
+    categories = distribution['categories']
+    
+    if not categories:
+        _plot_no_data(ax, "No category data available")
+        return
+    
+    # Prepare data
+    labels = list(categories.keys())
+    sizes = [data['count'] for data in categories.values()]
+    pie_colors = [colors.get(label, _DEFAULT_COLOR) for label in labels]
+    
+    # Create pie chart
+    wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=pie_colors,
+                                       autopct='%1.1f%%', startangle=90,
+                                       textprops={'fontsize': 10})
+    
+    # Enhance text
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    
+    ax.set_title(f'Email Category Distribution (Last {days} Days)',
+                 fontsize=14, fontweight='bold', pad=20)
+
+
+def _plot_category_bar(ax, distribution: Dict, days: int, colors: Dict[str, str]):
+    """
+    Draw categories as horizontal bars on an axes
+    
+    Args:
+        ax: Axes to draw on
+        distribution: Result of AnalyticsEngine.get_category_distribution
+        days: Number of days analyzed
+        colors: Category label to color mapping
+    """
+    categories = distribution['categories']
+    
+    if not categories:
+        _plot_no_data(ax, "No category data available")
+        return
+    
+    # Prepare data (sorted by count)
+    sorted_items = sorted(categories.items(), key=lambda x: x[1]['count'])
+    labels = [item[0] for item in sorted_items]
+    counts = [item[1]['count'] for item in sorted_items]
+    bar_colors = [colors.get(label, _DEFAULT_COLOR) for label in labels]
+    
+    # Create horizontal bar chart
+    bars = ax.barh(labels, counts, color=bar_colors, edgecolor='black', linewidth=0.5)
+    
+    # Add value labels on bars
+    for i, (bar, count) in enumerate(zip(bars, counts)):
+        ax.text(count + max(counts) * 0.01, i, str(count),
+               va='center', fontsize=10, fontweight='bold')
+    
+    # Formatting
+    ax.set_xlabel('Number of Emails', fontsize=12, fontweight='bold')
+    ax.set_title(f'Emails by Category (Last {days} Days)',
+                 fontsize=14, fontweight='bold')
+    ax.grid(True, axis='x', alpha=0.3, linestyle='--')
+
+
+def _plot_stacked_area(ax, trends: Dict, days: int, colors: Dict[str, str]):
+    """
+    Draw category trends over time as stacked areas on an axes
+    
+    Args:
+        ax: Axes to draw on
+        trends: Result of AnalyticsEngine.get_email_volume_trends
+        days: Number of days visualized
+        colors: Category label to color mapping
+    """
+    daily_by_category = trends['daily_by_category']
+    
+    if not daily_by_category:
+        _plot_no_data(ax, "No trend data available")
+        return
+    
+    # Prepare date range (the last `days` days through today)
+    today = np.datetime64(datetime.now().date(), 'D')
+    dates = np.arange(today - days, today + 1, dtype='datetime64[D]')
+    date_range = dates.astype(str).tolist()
+    
+    # Scatter each category's counts into one (categories x days) matrix
+    date_index = {d: i for i, d in enumerate(date_range)}
+    categories = list(daily_by_category.keys())
+    data_matrix = np.zeros((len(categories), len(date_range)), dtype=np.int32)
+    for row, category in enumerate(categories):
+        points = [(date_index[date], count) for date, count in daily_by_category[category]
+                  if date in date_index]
+        if points:
+            idxs, vals = zip(*points)
+            data_matrix[row, list(idxs)] = vals
+    
+    # Stack the areas
+    area_colors = [colors.get(cat, _DEFAULT_COLOR) for cat in categories]
+    
+    ax.stackplot(dates, data_matrix, labels=categories, colors=area_colors, alpha=0.8)
+    
+    # Formatting
+    ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Number of Emails', fontsize=12, fontweight='bold')
+    ax.set_title(f'Email Category Trends (Last {days} Days)',
+                 fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.legend(loc='upper left', fontsize=9, framealpha=0.9)
+    
+    # Format x-axis
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
+    ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, days // 10)))
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def _plot_success_funnel(ax, metrics: Dict, days: int, colors: Dict[str, str]):
+    """
+    Draw the job search success funnel on an axes
+    
+    Args:
+        ax: Axes to draw on
+        metrics: Result of AnalyticsEngine.get_success_metrics
+        days: Number of days analyzed
+        colors: Category label to color mapping (unused, shared signature)
+    """
+    # Prepare data
+    stages = ['Applications', 'Interviews', 'Offers']
+    values = [metrics['applications'], metrics['interviews'], metrics['offers']]
+    stage_colors = ['#95E1D3', '#FF6B6B', '#4ECDC4']
+    
+    # Create horizontal bar chart (funnel-style)
+    bars = ax.barh(stages, values, color=stage_colors, edgecolor='black', linewidth=1.5)
+    
+    # Add value labels and percentages
+    for i, (bar, value) in enumerate(zip(bars, values)):
+        ax.text(value + max(values) * 0.02, i, f'{value}',
+               va='center', fontsize=12, fontweight='bold')
+    
+    # Add conversion rates
+    if metrics['applications'] > 0:
+        ax.text(0.98, 0.95, f"Interview Rate: {metrics['interview_rate']:.1f}%",
+               transform=ax.transAxes, fontsize=11, ha='right',
+               bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
+    if metrics['interviews'] > 0:
+        ax.text(0.98, 0.88, f"Offer Rate: {metrics['offer_rate']:.1f}%",
+               transform=ax.transAxes, fontsize=11, ha='right',
+               bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.7))
+    
+    # Formatting
+    ax.set_xlabel('Count', fontsize=12, fontweight='bold')
+    ax.set_title(f'Job Search Success Funnel (Last {days} Days)',
+                 fontsize=14, fontweight='bold')
+    ax.grid(True, axis='x', alpha=0.3, linestyle='--')
+
+
+def _save_single_chart(name: str, figsize: Tuple[int, int], plot: Callable,
+                       data: Dict, chart_dir: str, days: int, colors: Dict[str, str],
+                       fast_png: bool = True) -> str:
+    """
+    Draw one chart on its reusable figure and save it as a PNG
+    
+    Args:
+        name: Chart type, used for the figure slot and the file name
+        figsize: Figure size in inches
+        plot: _plot_* helper that draws the chart
+        data: Analytics data passed to the helper
+        chart_dir: Directory to save the chart in
+        days: Number of days charted
+        colors: Category label to color mapping
+        fast_png: Trade file size for a faster PNG encode
+        
+    Returns:
+        Path to generated chart image
+    """
+    fig = _get_figure(name, figsize)
+    ax = fig.add_subplot(111)
+    plot(ax, data, days, colors)
+    
+    fig.tight_layout()
+    
+    # Save
+    filepath = os.path.join(chart_dir, f'{name}_{days}d.png')
+    _save_png(fig, filepath, fast_png)
+    
+    return filepath
+
+
+def _render_volume_trend(trends: Dict, chart_dir: str, days: int,
+                         colors: Dict[str, str], fast_png: bool = True) -> str:
+    """Render the volume trend chart, returning its path"""
+    if not trends['daily_volume']:
+        return _render_no_data("No email data available", chart_dir, fast_png)
+    return _save_single_chart('volume_trend', (12, 6), _plot_volume_trend,
+                              trends, chart_dir, days, colors, fast_png)
+
+
+def _render_category_pie(distribution: Dict, chart_dir: str, days: int,
+                         colors: Dict[str, str], fast_png: bool = True) -> str:
+    """Render the category pie chart, returning its path"""
+    if not distribution['categories']:
+        return _render_no_data("No category data available", chart_dir, fast_png)
+    return _save_single_chart('category_pie', (10, 8), _plot_category_pie,
+                              distribution, chart_dir, days, colors, fast_png)
+
+
+def _render_category_bar(distribution: Dict, chart_dir: str, days: int,
+                         colors: Dict[str, str], fast_png: bool = True) -> str:
+    """Render the category bar chart, returning its path"""
+    if not distribution['categories']:
+        return _render_no_data("No category data available", chart_dir, fast_png)
+    return _save_single_chart('category_bar', (10, 8), _plot_category_bar,
+                              distribution, chart_dir, days, colors, fast_png)
+
+
+def _render_stacked_area(trends: Dict, chart_dir: str, days: int,
+                         colors: Dict[str, str], fast_png: bool = True) -> str:
+    """Render the stacked area chart, returning its path"""
+    if not trends['daily_by_category']:
+        return _render_no_data("No trend data available", chart_dir, fast_png)
+    return _save_single_chart('stacked_area', (12, 7), _plot_stacked_area,
+                              trends, chart_dir, days, colors, fast_png)
+
+
+def _render_success_funnel(metrics: Dict, chart_dir: str, days: int,
+                           colors: Dict[str, str], fast_png: bool = True) -> str:
+    """Render the success funnel chart, returning its path"""
+    return _save_single_chart('success_funnel', (10, 6), _plot_success_funnel,
+                              metrics, chart_dir, days, colors, fast_png)
+
+
+def _render_dashboard(data: Dict, chart_dir: str, days: int,
+                      colors: Dict[str, str], fast_png: bool = True) -> str:
+    """
+    Render all five charts on one 3x2 figure with a single save
+    
+    Args:
+        data: Dict with 'trends', 'distribution' and 'metrics' analytics results
+        chart_dir: Directory to save the chart in
+        days: Number of days charted
+        colors: Category label to color mapping
+        fast_png: Trade file size for a faster PNG encode
+        
+    Returns:
+        Path to generated dashboard image
+    """
+    fig = _get_figure('dashboard', (20, 18))
+    axes = fig.subplots(3, 2)
+    
+    _plot_volume_trend(axes[0][0], data['trends'], days, colors)
+    _plot_stacked_area(axes[0][1], data['trends'], days, colors)
+    _plot_category_pie(axes[1][0], data['distribution'], days, colors)
+    _plot_category_bar(axes[1][1], data['distribution'], days, colors)
+    _plot_success_funnel(axes[2][0], data['metrics'], days, colors)
+    axes[2][1].axis('off')
+    
+    fig.suptitle(f'Email Analytics Dashboard (Last {days} Days)', fontsize=18, fontweight='bold')
+    fig.tight_layout(rect=(0, 0, 1, 0.97))
+    
+    # Save
+    filepath = os.path.join(chart_dir, f'dashboard_{days}d.png')
+    _save_png(fig, filepath, fast_png)
+    
+    return filepath
+
+
+def _render_no_data(message: str, chart_dir: str, fast_png: bool = True) -> str:
+    """
+    Render a placeholder chart when no data is available
+    
+    Args:
+        message: Message to display
+        chart_dir: Directory to save the chart in
+        fast_png: Trade file size for a faster PNG encode
+        
+    Returns:
+        Path to generated chart image
+    """
+    # The placeholder only depends on its message, so render each one once
+    digest = hashlib.md5(message.encode('utf-8')).hexdigest()[:8]
+    filepath = os.path.join(chart_dir, f'no_data_{digest}.png')
+    if os.path.exists(filepath):
+        return filepath
+    
+    fig = _get_figure('no_data', (8, 6))
+    ax = fig.add_subplot(111)
+    _plot_no_data(ax, message)
+    
+    _save_png(fig, filepath, fast_png)
+    
+    return filepath
+
 
 class AnalyticsVisualizer:
     """Generate charts and visualizations for email analytics"""
     
-    def __init__(self, analytics_engine: AnalyticsEngine, chart_dir: str = "charts"):
+    def __init__(self, analytics_engine: AnalyticsEngine, chart_dir: str = "charts",
+                 fast_png: bool = True):
         """
         Initialize visualizer
         
         Args:
             analytics_engine: AnalyticsEngine instance
             chart_dir: Directory to save generated charts
+            fast_png: Use fast, light PNG compression; disable for archival charts
         """
         self.engine = analytics_engine
         self.chart_dir = chart_dir
+        self.fast_png = fast_png
+        self._chart_cache = OrderedDict()  # {(chart, days, data digest): filepath}
         
         # Create chart directory if it doesn't exist
         os.makedirs(chart_dir, exist_ok=True)
         
         # Color scheme matching categories
-        self.category_colors = {
-            'Interview 📅': '#FF6B6B',
-            'Interview Reminder ⏰': '#FFA07A',
-            'Job Offer 🎉': '#4ECDC4',
-            'Applied ✓': '#95E1D3',
-            'Rejected ❌': '#F38181',
-            'Assessment 📝': '#AA96DA',
-            'Follow-up 💬': '#FCBAD3',
-            'Job Alert 🔔': '#FFFFD2',
-            'Newsletter 📰': '#A8E6CF',
-            'Spam 🗑️': '#C7CEEA',
-            'Other 📧': '#DCDCDC'
-        }
+        self.category_colors = _CATEGORY_COLORS
     
     def generate_volume_trend_chart(self, days: int = 30) -> str:
         """
@@ -51,55 +502,11 @@ class AnalyticsVisualizer:
         
         Args:
             days: Number of days to visualize
-            
+        
         Returns:
             Path to generated chart image
         """
-        trends = self.engine.get_email_volume_trends(days)
-        daily_volume = trends['daily_volume']
-        
-        if not daily_volume:
-            return self._generate_no_data_chart("No email data available")
-        
-        # Prepare data
-        dates = [datetime.strptime(date, '%Y-%m-%d') for date, _ in daily_volume]
-        counts = [count for _, count in daily_volume]
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Plot line
-        ax.plot(dates, counts, marker='o', linewidth=2, markersize=6, 
-                color='#4ECDC4', label='Daily Emails')
-        
-        # Fill area under curve
-        ax.fill_between(dates, counts, alpha=0.3, color='#4ECDC4')
-        
-        # Formatting
-        ax.set_xlabel('Date', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Number of Emails', fontsize=12, fontweight='bold')
-        ax.set_title(f'Email Volume Trend (Last {days} Days)', fontsize=14, fontweight='bold')
-        ax.grid(True, alpha=0.3, linestyle='--')
-        
-        # Format x-axis dates
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, days // 10)))
-        plt.xticks(rotation=45)
-        
-        # Add trend annotation
-        trend_text = f"Trend: {trends['trend_direction'].title()} ({trends['trend_percentage']:+.1f}%)"
-        ax.text(0.02, 0.98, trend_text, transform=ax.transAxes,
-                fontsize=10, verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        plt.tight_layout()
-        
-        # Save
-        filepath = os.path.join(self.chart_dir, f'volume_trend_{days}d.png')
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._render(self.engine.get_email_volume_trends, _render_volume_trend, days)
     
     def generate_category_pie_chart(self, days: int = 30) -> str:
         """
@@ -107,45 +514,11 @@ class AnalyticsVisualizer:
         
         Args:
             days: Number of days to analyze
-            
+        
         Returns:
             Path to generated chart image
         """
-        distribution = self.engine.get_category_distribution(days)
-        categories = distribution['categories']
-        
-        if not categories:
-            return self._generate_no_data_chart("No category data available")
-        
-        # Prepare data
-        labels = list(categories.keys())
-        sizes = [data['count'] for data in categories.values()]
-        colors = [self.category_colors.get(label, '#CCCCCC') for label in labels]
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(10, 8))
-        
-        # Create pie chart
-        wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors,
-                                           autopct='%1.1f%%', startangle=90,
-                                           textprops={'fontsize': 10})
-        
-        # Enhance text
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-        
-        ax.set_title(f'Email Category Distribution (Last {days} Days)', 
-                     fontsize=14, fontweight='bold', pad=20)
-        
-        plt.tight_layout()
-        
-        # Save
-        filepath = os.path.join(self.chart_dir, f'category_pie_{days}d.png')
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._render(self.engine.get_category_distribution, _render_category_pie, days)
     
     def generate_category_bar_chart(self, days: int = 30) -> str:
         """
@@ -153,47 +526,11 @@ class AnalyticsVisualizer:
         
         Args:
             days: Number of days to analyze
-            
+        
         Returns:
             Path to generated chart image
         """
-        distribution = self.engine.get_category_distribution(days)
-        categories = distribution['categories']
-        
-        if not categories:
-            return self._generate_no_data_chart("No category data available")
-        
-        # Prepare data (sorted by count)
-        sorted_items = sorted(categories.items(), key=lambda x: x[1]['count'])
-        labels = [item[0] for item in sorted_items]
-        counts = [item[1]['count'] for item in sorted_items]
-        colors = [self.category_colors.get(label, '#CCCCCC') for label in labels]
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(10, 8))
-        
-        # Create horizontal bar chart
-        bars = ax.barh(labels, counts, color=colors, edgecolor='black', linewidth=0.5)
-        
-        # Add value labels on bars
-        for i, (bar, count) in enumerate(zip(bars, counts)):
-            ax.text(count + max(counts) * 0.01, i, str(count),
-                   va='center', fontsize=10, fontweight='bold')
-        
-        # Formatting
-        ax.set_xlabel('Number of Emails', fontsize=12, fontweight='bold')
-        ax.set_title(f'Emails by Category (Last {days} Days)', 
-                     fontsize=14, fontweight='bold')
-        ax.grid(True, axis='x', alpha=0.3, linestyle='--')
-        
-        plt.tight_layout()
-        
-        # Save
-        filepath = os.path.join(self.chart_dir, f'category_bar_{days}d.png')
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._render(self.engine.get_category_distribution, _render_category_bar, days)
     
     def generate_stacked_area_chart(self, days: int = 30) -> str:
         """
@@ -201,62 +538,11 @@ class AnalyticsVisualizer:
         
         Args:
             days: Number of days to visualize
-            
+        
         Returns:
             Path to generated chart image
         """
-        trends = self.engine.get_email_volume_trends(days)
-        daily_by_category = trends['daily_by_category']
-        
-        if not daily_by_category:
-            return self._generate_no_data_chart("No trend data available")
-        
-        # Prepare date range
-        start_date = datetime.now() - timedelta(days=days)
-        date_range = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') 
-                     for i in range(days + 1)]
-        dates = [datetime.strptime(d, '%Y-%m-%d') for d in date_range]
-        
-        # Prepare data for each category
-        category_data = {}
-        for category, data_points in daily_by_category.items():
-            counts = {date: 0 for date in date_range}
-            for date, count in data_points:
-                if date in counts:
-                    counts[date] = count
-            category_data[category] = [counts[date] for date in date_range]
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(12, 7))
-        
-        # Stack the areas
-        categories = list(category_data.keys())
-        data_matrix = [category_data[cat] for cat in categories]
-        colors = [self.category_colors.get(cat, '#CCCCCC') for cat in categories]
-        
-        ax.stackplot(dates, *data_matrix, labels=categories, colors=colors, alpha=0.8)
-        
-        # Formatting
-        ax.set_xlabel('Date', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Number of Emails', fontsize=12, fontweight='bold')
-        ax.set_title(f'Email Category Trends (Last {days} Days)', 
-                     fontsize=14, fontweight='bold')
-        ax.grid(True, alpha=0.3, linestyle='--')
-        ax.legend(loc='upper left', fontsize=9, framealpha=0.9)
-        
-        # Format x-axis
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, days // 10)))
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
-        
-        # Save
-        filepath = os.path.join(self.chart_dir, f'stacked_area_{days}d.png')
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._render(self.engine.get_email_volume_trends, _render_stacked_area, days)
     
     def generate_success_metrics_chart(self, days: int = 30) -> str:
         """
@@ -264,75 +550,120 @@ class AnalyticsVisualizer:
         
         Args:
             days: Number of days to analyze
-            
+        
         Returns:
             Path to generated chart image
         """
-        metrics = self.engine.get_success_metrics(days)
-        
-        # Prepare data
-        stages = ['Applications', 'Interviews', 'Offers']
-        values = [metrics['applications'], metrics['interviews'], metrics['offers']]
-        colors = ['#95E1D3', '#FF6B6B', '#4ECDC4']
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Create horizontal bar chart (funnel-style)
-        bars = ax.barh(stages, values, color=colors, edgecolor='black', linewidth=1.5)
-        
-        # Add value labels and percentages
-        for i, (bar, value) in enumerate(zip(bars, values)):
-            ax.text(value + max(values) * 0.02, i, f'{value}',
-                   va='center', fontsize=12, fontweight='bold')
-        
-        # Add conversion rates
-        if metrics['applications'] > 0:
-            ax.text(0.98, 0.95, f"Interview Rate: {metrics['interview_rate']:.1f}%",
-                   transform=ax.transAxes, fontsize=11, ha='right',
-                   bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
-        if metrics['interviews'] > 0:
-            ax.text(0.98, 0.88, f"Offer Rate: {metrics['offer_rate']:.1f}%",
-                   transform=ax.transAxes, fontsize=11, ha='right',
-                   bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.7))
-        
-        # Formatting
-        ax.set_xlabel('Count', fontsize=12, fontweight='bold')
-        ax.set_title(f'Job Search Success Funnel (Last {days} Days)', 
-                     fontsize=14, fontweight='bold')
-        ax.grid(True, axis='x', alpha=0.3, linestyle='--')
+        return self._render(self.engine.get_success_metrics, _render_success_funnel, days)
+    
+    def generate_dashboard(self, days: int = 30) -> str:
+        """
+        Generate all five charts as one dashboard image
         
-        plt.tight_layout()
+        Args:
+            days: Number of days to visualize
+            
+        Returns:
+            Path to generated dashboard image
+        """
+        return self._render(self._get_dashboard_data, _render_dashboard, days)
+    
+    async def generate_volume_trend_chart_async(self, days: int = 30) -> str:
+        """Render the volume trend chart in the chart process pool"""
+        return await self._render_async(self.engine.get_email_volume_trends, _render_volume_trend, days)
+    
+    async def generate_category_pie_chart_async(self, days: int = 30) -> str:
+        """Render the category pie chart in the chart process pool"""
+        return await self._render_async(self.engine.get_category_distribution, _render_category_pie, days)
+    
+    async def generate_category_bar_chart_async(self, days: int = 30) -> str:
+        """Render the category bar chart in the chart process pool"""
+        return await self._render_async(self.engine.get_category_distribution, _render_category_bar, days)
+    
+    async def generate_stacked_area_chart_async(self, days: int = 30) -> str:
+        """Render the stacked area chart in the chart process pool"""
+        return await self._render_async(self.engine.get_email_volume_trends, _render_stacked_area, days)
+    
+    async def generate_success_metrics_chart_async(self, days: int = 30) -> str:
+        """Render the success funnel chart in the chart process pool"""
+        return await self._render_async(self.engine.get_success_metrics, _render_success_funnel, days)
+    
+    async def generate_dashboard_async(self, days: int = 30) -> str:
+        """Render the dashboard in the chart process pool"""
+        return await self._render_async(self._get_dashboard_data, _render_dashboard, days)
+    
+    def _get_dashboard_data(self, days: int) -> Dict:
+        """Collect the analytics results every dashboard panel needs"""
+        return {
+            'trends': self.engine.get_email_volume_trends(days),
+            'distribution': self.engine.get_category_distribution(days),
+            'metrics': self.engine.get_success_metrics(days)
+        }
+    
+    def _lookup_chart(self, data_getter: Callable, renderer: Callable, days: int) -> Tuple[Tuple, Dict, Optional[str]]:
+        """
+        Fetch a chart's input data and check whether it was already rendered
         
-        # Save
-        filepath = os.path.join(self.chart_dir, f'success_funnel_{days}d.png')
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
+        Args:
+            data_getter: Callable taking days and returning the chart's input data
+            renderer: Module-level render function for the chart
+            days: Number of days to chart
         
+        Returns:
+            Tuple of (cache key, chart data, cached filepath or None)
+        """
+        data = data_getter(days)
+        key = (renderer.__name__, days, _data_digest(data))
+        
+        filepath = self._chart_cache.get(key)
+        if filepath and os.path.exists(filepath):
+            self._chart_cache.move_to_end(key)
+            return key, data, filepath
+        return key, data, None
+    
+    def _render(self, data_getter: Callable, renderer: Callable, days: int) -> str:
+        """Render a chart in-process, skipping it when its input data hasn't changed"""
+        key, data, filepath = self._lookup_chart(data_getter, renderer, days)
+        if filepath:
+            return filepath
+        
+        filepath = renderer(data, self.chart_dir, days, self.category_colors, self.fast_png)
+        self._remember_chart(key, filepath)
+        return filepath
+    
+    async def _render_async(self, data_getter: Callable, renderer: Callable, days: int) -> str:
+        """Render a chart in the process pool so the event loop never blocks on matplotlib"""
+        key, data, filepath = self._lookup_chart(data_getter, renderer, days)
+        if filepath:
+            return filepath
+        
+        # Workers may not share our working directory, so hand them an absolute path
+        chart_dir = os.path.abspath(self.chart_dir)
+        loop = asyncio.get_running_loop()
+        filepath = await loop.run_in_executor(_get_chart_pool(), renderer, data,
+                                              chart_dir, days, self.category_colors, self.fast_png)
+        self._remember_chart(key, filepath)
         return filepath
     
+    def _remember_chart(self, key: Tuple, filepath: str):
+        """Record a rendered chart, evicting stale entries that point at the same file"""
+        for stale_key in [k for k, path in self._chart_cache.items() if path == filepath]:
+            del self._chart_cache[stale_key]
+        self._chart_cache[key] = filepath
+        while len(self._chart_cache) > CHART_CACHE_SIZE:
+            self._chart_cache.popitem(last=False)
+    
     def _generate_no_data_chart(self, message: str) -> str:
         """
         Generate a placeholder chart when no data is available
         
         Args:
             message: Message to display
-            
+        
         Returns:
             Path to generated chart image
         """
-        fig, ax = plt.subplots(figsize=(8, 6))
-        ax.text(0.5, 0.5, message, ha='center', va='center',
-                fontsize=16, fontweight='bold', color='gray')
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
-        
-        filepath = os.path.join(self.chart_dir, 'no_data.png')
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return _render_no_data(message, self.chart_dir, self.fast_png)
     
     def cleanup_old_charts(self, max_age_hours: int = 24):
         """
@@ -342,16 +673,20 @@ class AnalyticsVisualizer:
             max_age_hours: Maximum age of charts to keep
         """
         if not os.path.exists(self.chart_dir):
+            self._chart_cache.clear()
             return
         
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+        cutoff_ts = (datetime.now() - timedelta(hours=max_age_hours)).timestamp()
         
-        for filename in os.listdir(self.chart_dir):
-            filepath = os.path.join(self.chart_dir, filename)
-            if os.path.isfile(filepath):
-                file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                if file_time < cutoff_time:
+        # scandir entries answer is_file()/stat() from one cached lookup per file
+        with os.scandir(self.chart_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff_ts:
                     try:
-                        os.remove(filepath)
-                    except Exception as e:
-                        print(f"Error removing old chart {filename}: {e}")
+                        os.remove(entry.path)
+                    except OSError as e:
+                        print(f"Error removing old chart {entry.name}: {e}")
+        
+        # Forget cached charts whose files were just removed
+        for key in [k for k, path in self._chart_cache.items() if not os.path.exists(path)]:
+            del self._chart_cache[key]
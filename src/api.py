@@ -5,9 +5,12 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from contextlib import asynccontextmanager
 
+from src.config import configure_console
 from src.agent_controller import start_agent, stop_agent, get_agent_status
 from src.telegram_bot import get_bot_handler
 
+configure_console()
+
 # Lifespan context manager for startup/shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -47,7 +50,7 @@ async def start_agent_endpoint(request: Request, mode: str = "monitor"):
 @app.post("/agent/stop")
 @limiter.limit("5/minute")
 async def stop_agent_endpoint(request: Request):
-    result = stop_agent()
+    result = await stop_agent()
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
@@ -0,0 +1,126 @@
+"""
+Persistence for the Telegram bot's per-chat state (pending drafts and input prompts).
+Uses SQLite so a restart doesn't throw away drafts the LLM already wrote.
+"""
+import sqlite3
+import threading
+import time
+import orjson
+from typing import Dict, Optional
+from .config import BOT_STATE_DB_PATH, BOT_STATE_TTL_HOURS
+
+
+class BotStateStore:
+    """SQLite table of orjson-encoded payloads keyed by (kind, chat_id), each with an expiry time"""
+
+    def __init__(self, db_path: str = BOT_STATE_DB_PATH):
+        """Open the database and create the table if needed"""
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_state (
+                kind TEXT NOT NULL,
+                chat_id INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (kind, chat_id)
+            )
+        """)
+        self.conn.commit()
+
+    def load(self, kind: str) -> Dict[int, dict]:
+        """
+        Load every unexpired entry of one kind, dropping expired rows
+
+        Args:
+            kind: State kind, e.g. 'drafts' or 'user_states'
+
+        Returns:
+            Dictionary mapping chat id to its stored payload
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("DELETE FROM chat_state WHERE expires_at <= ?", (now,))
+            self.conn.commit()
+            rows = self.conn.execute(
+                "SELECT chat_id, payload FROM chat_state WHERE kind = ?", (kind,)
+            ).fetchall()
+        return {chat_id: orjson.loads(payload) for chat_id, payload in rows}
+
+    def save(self, kind: str, chat_id: int, payload: dict) -> bool:
+        """Insert or replace one entry, restarting its BOT_STATE_TTL_HOURS expiry"""
+        expires_at = time.time() + BOT_STATE_TTL_HOURS * 3600
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO chat_state (kind, chat_id, payload, expires_at) VALUES (?, ?, ?, ?)",
+                    (kind, chat_id, orjson.dumps(payload), expires_at)
+                )
+                self.conn.commit()
+            return True
+        except Exception as e:
+            print(f"[ERROR] Could not save bot {kind} for chat {chat_id}: {e}")
+            return False
+
+    def delete(self, kind: str, chat_id: int):
+        """Remove one entry"""
+        try:
+            with self._lock:
+                self.conn.execute("DELETE FROM chat_state WHERE kind = ? AND chat_id = ?", (kind, chat_id))
+                self.conn.commit()
+        except Exception as e:
+            print(f"[ERROR] Could not delete bot {kind} for chat {chat_id}: {e}")
+
+    def close(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+
+
+class PersistentChatDict(dict):
+    """
+    {chat_id: payload} dict that writes every assignment and deletion through to a BotStateStore.
+    Payloads changed in place must be re-assigned to be saved.
+    """
+
+    def __init__(self, store: Optional[BotStateStore], kind: str):
+        super().__init__(store.load(kind) if store else {})
+        self._store = store
+        self._kind = kind
+
+    def __setitem__(self, chat_id, payload):
+        super().__setitem__(chat_id, payload)
+        if self._store:
+            self._store.save(self._kind, chat_id, payload)
+
+    def __delitem__(self, chat_id):
+        super().__delitem__(chat_id)
+        if self._store:
+            self._store.delete(self._kind, chat_id)
+
+    def pop(self, chat_id, default=None):
+        """Remove and return an entry (and its stored row), or default if it's already gone"""
+        if chat_id not in self:
+            return default
+        payload = super().pop(chat_id)
+        if self._store:
+            self._store.delete(self._kind, chat_id)
+        return payload
+
+
+# Global store instance
+_store_instance = None
+
+def get_bot_state_store() -> Optional[BotStateStore]:
+    """Get or create the global bot state store, or None if the database can't be opened"""
+    global _store_instance
+    if _store_instance is None:
+        try:
+            _store_instance = BotStateStore()
+        except Exception as e:
+            print(f"[ERROR] Could not open bot state database, drafts won't survive restarts: {e}")
+            return None
+    return _store_instance
@@ -1,5 +1,45 @@
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
 from langchain_core.prompts import PromptTemplate
-from .config import EMAIL_CLASSIFICATION_PROMPT, JOB_CATEGORIES
+from .config import (
+    EMAIL_CLASSIFICATION_PROMPT, BATCH_EMAIL_CLASSIFICATION_PROMPT, REPLY_PROMPT,
+    CLASSIFICATION_BATCH_SIZE, CLASSIFICATION_MAX_CONCURRENCY,
+    CLASSIFICATION_CACHE_SIZE, JOB_CATEGORIES
+)
+
+logger = logging.getLogger(__name__)
+
+# Category list shown to the LLM; JOB_CATEGORIES never changes at runtime
+_CATEGORIES_STR = ", ".join(JOB_CATEGORIES.keys())
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# One scan picks the first category key in a response, tolerating quotes,
+# punctuation and prefixes like "Category: interview_request."
+_CATEGORY_KEYS = tuple(sorted(JOB_CATEGORIES, key=len, reverse=True))
+_CATEGORY_RE = re.compile(r"\b(" + "|".join(re.escape(k) for k in _CATEGORY_KEYS) + r")\b", re.IGNORECASE)
+
+
+def _match_category(response):
+    """Return the first category key mentioned in an LLM response, or 'uncategorized'"""
+    match = _CATEGORY_RE.search(response)
+    return match.group(1).lower() if match else "uncategorized"
+
+
+def _cache_key(email):
+    """Normalized (subject, snippet) digest so near-identical emails share a cache entry"""
+    subject = _WHITESPACE_RE.sub(" ", email.get("subject", "")[:200]).strip().lower()
+    snippet = _WHITESPACE_RE.sub(" ", email.get("snippet", "")[:500]).strip().lower()
+    return hashlib.blake2b(f"{subject}|{snippet}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _message_content(response_msg):
+    """Text of a chat model message"""
+    return response_msg.content
+
 
 class EmailCategorizer:
     """Email categorizer using LLM Model defined by user."""
@@ -13,82 +53,186 @@ class EmailCategorizer:
         # Use LCEL: Prompt | LLM
         self.chain = self.prompt_template | self.llm
 
+        self.batch_prompt_template = PromptTemplate(
+            input_variables=["categories", "emails"],
+            template=BATCH_EMAIL_CLASSIFICATION_PROMPT
+        )
+        self.batch_chain = self.batch_prompt_template | self.llm
+
+        self.reply_prompt_template = PromptTemplate(
+            input_variables=["email_content", "instructions"],
+            template=REPLY_PROMPT
+        )
+        self.reply_chain = self.reply_prompt_template | self.llm
+
+        # {normalized subject+snippet digest: category key}, least recently used first
+        self._category_cache = OrderedDict()
+
+        # Response text extractor, chosen from the first response this LLM returns
+        self._unwrap = None
+
 
     def categorize(self, emails):
-        """Categorize a list of emails"""
-        results = []
-        categories_str = ", ".join(JOB_CATEGORIES.keys())
+        """Categorize a list of emails, running the per-email LLM calls concurrently"""
+        results, pending = self._split_cached(emails)
+        if pending:
+            classified = self._classify_each([group[0] for group in pending.values()])
+            self._merge_classified(results, pending, classified)
+        return results
 
-        for email in emails:
+    async def categorize_async(self, emails):
+        """Async variant of categorize for callers already on an event loop"""
+        results, pending = self._split_cached(emails)
+        if pending:
+            unique = [group[0] for group in pending.values()]
+            responses = await self.chain.abatch(
+                self._build_inputs(unique),
+                config={"max_concurrency": CLASSIFICATION_MAX_CONCURRENCY},
+                return_exceptions=True
+            )
+            self._merge_classified(results, pending, self._collect_results(unique, responses))
+        return results
+
+    def _classify_each(self, emails):
+        """Send one classification request per email, concurrently"""
+        responses = self.chain.batch(
+            self._build_inputs(emails),
+            config={"max_concurrency": CLASSIFICATION_MAX_CONCURRENCY},
+            return_exceptions=True
+        )
+        return self._collect_results(emails, responses)
+
+    def _build_inputs(self, emails):
+        """Build one prompt input dict per email"""
+        return [
+            {
+                "subject": email.get("subject", ""),
+                "snippet": email.get("snippet", ""),
+                "categories": _CATEGORIES_STR
+            }
+            for email in emails
+        ]
+
+    def _collect_results(self, emails, responses):
+        """Match batched LLM responses back to their emails"""
+        results = []
+        for email, response_msg in zip(emails, responses):
             subject = email.get("subject", "")
-            snippet = email.get("snippet", "")
+            if isinstance(response_msg, Exception):
+                print(f"Error classifying email '{subject}': {response_msg}")
+                continue
             try:
-                # Use invoke instead of run
-                response_msg = self.chain.invoke({
-                    "subject": subject,
-                    "snippet": snippet,
-                    "categories": categories_str
-                })
-                
-                # Handle response type (it might be a string or AIMessage)
-                if hasattr(response_msg, 'content'):
-                    response = response_msg.content.strip().lower()
-                else:
-                    response = str(response_msg).strip().lower()
-
                 # match valid category or fallback
-                category_key = (
-                    response if response in JOB_CATEGORIES else "uncategorized"
-                )
-                label = JOB_CATEGORIES[category_key]["label"]
+                category_key = _match_category(self._response_text(response_msg))
+                results.append(self._assign_category(email, category_key))
 
-                email["category"] = category_key
-                email["category_label"] = label
-                results.append(email)
+            except Exception as e:
+                print(f"Error classifying email '{subject}': {e}")
+
+        return results
 
-                try:
-                    print(f"{subject[:60]} -> {label}")
-                except UnicodeEncodeError:
-                    print(f"{subject[:60].encode('ascii', 'replace').decode('ascii')} -> {label.encode('ascii', 'replace').decode('ascii')}")
+    def categorize_batch(self, emails):
+        """
+        Categorize a list of emails with one LLM request per batch.
+        Falls back to per-email classification if a batched response can't be parsed.
+        """
+        results, pending = self._split_cached(emails)
+        if pending:
+            classified = self._classify_batched([group[0] for group in pending.values()])
+            self._merge_classified(results, pending, classified)
+        return results
+
+    def _classify_batched(self, emails):
+        """Classify emails in chunks of CLASSIFICATION_BATCH_SIZE per LLM request"""
+        results = []
 
+        for start in range(0, len(emails), CLASSIFICATION_BATCH_SIZE):
+            batch = emails[start:start + CLASSIFICATION_BATCH_SIZE]
+            emails_str = "\n\n".join(
+                f"[{i}] Subject: {email.get('subject', '')}\n    Snippet: {email.get('snippet', '')}"
+                for i, email in enumerate(batch, 1)
+            )
+            try:
+                response_msg = self.batch_chain.invoke({
+                    "categories": _CATEGORIES_STR,
+                    "emails": emails_str
+                })
+                category_keys = self._parse_batch_response(self._response_text(response_msg), len(batch))
             except Exception as e:
-                print(f"Error classifying email '{subject}': {e}")
+                print(f"Batch classification failed, classifying {len(batch)} emails one by one: {e}")
+                results.extend(self._classify_each(batch))
+                continue
+
+            for email, category_key in zip(batch, category_keys):
+                results.append(self._assign_category(email, category_key))
 
         return results
 
+    def _parse_batch_response(self, response, expected):
+        """Parse a JSON array of category keys, mapping unrecognized entries to 'uncategorized'"""
+        start, end = response.find("["), response.rfind("]")
+        if start == -1 or end < start:
+            raise ValueError("no JSON array in response")
+        keys = json.loads(response[start:end + 1])
+        if not isinstance(keys, list) or len(keys) != expected:
+            raise ValueError(f"expected {expected} categories, got {len(keys) if isinstance(keys, list) else 'non-list'}")
+        return [_match_category(str(key)) for key in keys]
+
+    def _response_text(self, response_msg):
+        """Return the text of an LLM response (a string or a message with .content)"""
+        if self._unwrap is None:
+            self._unwrap = _message_content if hasattr(response_msg, 'content') else str
+        return self._unwrap(response_msg)
+
+    def _split_cached(self, emails):
+        """
+        Serve emails seen before from the category cache.
+        Returns (already categorized emails, {cache key: [emails still to classify]}).
+        """
+        results, pending = [], {}
+        for email in emails:
+            key = _cache_key(email)
+            category_key = self._category_cache.get(key)
+            if category_key is not None:
+                self._category_cache.move_to_end(key)
+                results.append(self._assign_category(email, category_key))
+            else:
+                pending.setdefault(key, []).append(email)
+        return results, pending
+
+    def _merge_classified(self, results, pending, classified):
+        """Cache fresh classifications and copy them to duplicate emails in the same run"""
+        for email in classified:
+            key = _cache_key(email)
+            category_key = email["category"]
+            # Don't pin unparseable answers; the next run gets another try
+            if category_key != "uncategorized":
+                self._category_cache[key] = category_key
+                self._category_cache.move_to_end(key)
+            results.append(email)
+            for duplicate in pending.get(key, [])[1:]:
+                results.append(self._assign_category(duplicate, category_key))
+        while len(self._category_cache) > CLASSIFICATION_CACHE_SIZE:
+            self._category_cache.popitem(last=False)
+
+    def _assign_category(self, email, category_key):
+        """Attach the category key and label to an email dict"""
+        label = JOB_CATEGORIES[category_key]["label"]
+        email["category"] = category_key
+        email["category_label"] = label
+
+        logger.info("%s -> %s", email.get("subject", "")[:60], label)
+        return email
+
     def generate_reply(self, email_content, instructions=""):
         """Generate a reply to an email based on instructions"""
         try:
-            from langchain_core.prompts import PromptTemplate
-            
-            reply_template = """
-            You are a helpful email assistant. Draft a professional reply to the following email.
-            
-            Original Email:
-            {email_content}
-            
-            Instructions for reply:
-            {instructions}
-            
-            Draft Reply:
-            """
-            
-            prompt = PromptTemplate(
-                input_variables=["email_content", "instructions"],
-                template=reply_template
-            )
-            
-            chain = prompt | self.llm
-            
-            response_msg = chain.invoke({
+            response_msg = self.reply_chain.invoke({
                 "email_content": email_content,
                 "instructions": instructions
             })
             
-            if hasattr(response_msg, 'content'):
-                return response_msg.content.strip()
-            else:
-                return str(response_msg).strip()
+            return self._response_text(response_msg).strip()
                 
         except Exception as e:
             print(f"Error generating reply: {e}")
@@ -1,4 +1,6 @@
+import logging
 import os
+import sys
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,16 +16,56 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 # Telegram Configuration
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_MAX_MESSAGES_PER_SECOND = 25  # Telegram caps bots at ~30 messages/sec
+TELEGRAM_NOTIFY_WORKERS = 8
+TELEGRAM_REQUEST_TIMEOUT = 10  # seconds
+TELEGRAM_POLL_TIMEOUT = 20  # seconds; getUpdates long-poll duration
+TELEGRAM_LABEL_STATS_TTL = 60  # seconds /labels reuses label statistics
+TELEGRAM_LABEL_EMAILS_TTL = 30  # seconds a label's email list is reused by /view and label buttons
+TELEGRAM_MAX_LABEL_BUTTONS = 50  # /labels shows the largest labels only (inline keyboards cap at 100 buttons)
+TELEGRAM_MESSAGE_CHUNK_SIZE = 4000  # long replies are split below Telegram's 4096-character limit
+TELEGRAM_GMAIL_MAX_BACKOFF = 64  # seconds; cap on the bot's Gmail cooldown after repeated failures
+TELEGRAM_REPLY_CACHE_SIZE = 64  # generated draft replies remembered per (message, instructions)
 
 # Categories considered important for Telegram notification
 IMPORTANT_CATEGORIES = ["interview_request", "interview_reminder", "follow_up"]
 
+# Logging
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+
+def configure_console():
+    """Set up logging and make stdout/stderr UTF-8, so emoji labels and subjects don't crash prints on legacy Windows consoles"""
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8", errors="replace")
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+
 # Polling Interval (in seconds)
 POLLING_INTERVAL = 3600  # hour
 
+# Gmail Push Notifications (optional; requires google-cloud-pubsub)
+# With both set, the agent runs a cycle as soon as Gmail reports an inbox change;
+# POLLING_INTERVAL remains the fallback wake-up.
+GMAIL_PUBSUB_TOPIC = os.getenv("GMAIL_PUBSUB_TOPIC")  # projects/<project>/topics/<topic>
+GMAIL_PUBSUB_SUBSCRIPTION = os.getenv("GMAIL_PUBSUB_SUBSCRIPTION")  # projects/<project>/subscriptions/<sub>
+GMAIL_WATCH_RENEW_INTERVAL = 6 * 24 * 3600  # seconds; Gmail watches expire after 7 days
+
 # Analytics Configuration
 ANALYTICS_DB_PATH = 'analytics.db'
 ANALYTICS_CHART_DIR = 'charts'
+ANALYTICS_CACHE_TTL = 15  # seconds to reuse computed analytics for the same period
+
+# Bot State
+BOT_STATE_DB_PATH = 'bot_state.db'  # pending drafts and prompts, kept across restarts
+BOT_STATE_TTL_HOURS = 24  # stored drafts older than this are dropped
+
+# Gmail Label Cache
+LABEL_CACHE_TTL = 300  # seconds GmailHandler reuses its user label list
+
+# Processed Email Tracking
+PROCESSED_IDS_LOOKBACK_HOURS = 48  # labeled emails reloaded at startup; covers the 24h polling window
 
 # Job Categories
 JOB_CATEGORIES = {
@@ -40,13 +82,8 @@ JOB_CATEGORIES = {
     "uncategorized": {"label": "Other 📧"}
 }
 
-# Email Classification Prompt
-EMAIL_CLASSIFICATION_PROMPT = """
-You are a precise email classifier for job-related emails.
-Your task is to assign the email to EXACTLY ONE of the following category keys:
-
-{categories}
-
+# Category definitions shared by the single and batch classification prompts
+CATEGORY_GUIDE = """
 =========================
 CATEGORY DEFINITIONS
 =========================
@@ -90,7 +127,15 @@ CATEGORY PRIORITY
 interview_request > interview_reminder > offer > rejected > assessment >
 follow_up > application_confirmed > job_alert > newsletter > spam > uncategorized
 
-=========================
+"""
+
+# Email Classification Prompt
+EMAIL_CLASSIFICATION_PROMPT = """
+You are a precise email classifier for job-related emails.
+Your task is to assign the email to EXACTLY ONE of the following category keys:
+
+{categories}
+""" + CATEGORY_GUIDE + """=========================
 EMAIL TO CLASSIFY
 =========================
 
@@ -106,3 +151,48 @@ RESPONSE RULES
 - No formatting.
 Category:
 """
+
+# Batch Email Classification Prompt (many emails, one LLM request)
+# The static instructions come first so provider-side prefix caching can reuse them.
+BATCH_EMAIL_CLASSIFICATION_PROMPT = """
+You are a precise email classifier for job-related emails.
+Your task is to assign EACH email below to EXACTLY ONE of the following category keys:
+
+{categories}
+""" + CATEGORY_GUIDE + """=========================
+EMAILS TO CLASSIFY
+=========================
+
+{emails}
+
+=========================
+RESPONSE RULES
+=========================
+- Respond with ONLY a JSON array of category keys, one per email, in the same order.
+- Example for three emails: ["job_alert", "spam", "offer"]
+- No explanation.
+- No extra text.
+- No formatting.
+"""
+
+# Prompt for drafting replies from Telegram
+REPLY_PROMPT = """
+You are a helpful email assistant. Draft a professional reply to the following email.
+
+Original Email:
+{email_content}
+
+Instructions for reply:
+{instructions}
+
+Draft Reply:
+"""
+
+# Maximum number of emails sent to the LLM in one batch classification request
+CLASSIFICATION_BATCH_SIZE = 25
+
+# Maximum concurrent LLM calls when classifying emails one request per email
+CLASSIFICATION_MAX_CONCURRENCY = 16
+
+# Number of (subject, snippet) classifications remembered in memory per categorizer
+CLASSIFICATION_CACHE_SIZE = 2048
@@ -1,9 +1,134 @@
+import asyncio
+import base64
+import logging
 import os
+import threading
+import time
+import aiohttp
+import google_auth_httplib2
+import httplib2
+import orjson
+from datetime import datetime, timezone
+from email.utils import formataddr, parseaddr
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from .config import SCOPES, CREDENTIALS_FILE, TOKEN_FILE
+from googleapiclient.errors import HttpError
+from googleapiclient.http import set_user_agent
+from googleapiclient.model import JsonModel
+from .config import SCOPES, CREDENTIALS_FILE, TOKEN_FILE, LABEL_CACHE_TTL
+
+# Transport settings for the googleapiclient service; googleapiclient already
+# asks for gzip bodies, the user agent just identifies the agent in Google's logs
+GMAIL_HTTP_TIMEOUT = 30
+GMAIL_USER_AGENT = "email-agent/1.0"
+
+# Gmail accepts up to 100 calls per batch request but recommends at most 50
+BATCH_GET_LIMIT = 50
+
+# Gmail returns at most 500 message ids per messages.list page
+LIST_PAGE_LIMIT = 500
+
+# Only the headers and fields _parse_message reads are requested from Gmail
+MESSAGE_HEADERS = ['Subject', 'From']
+MESSAGE_FIELDS = 'id,threadId,labelIds,snippet,payload/headers'
+MESSAGE_LIST_FIELDS = 'messages/id,nextPageToken'
+LABEL_STATS_FIELDS = 'messagesTotal'
+
+# messages.list search queries for get_emails_since
+SINCE_QUERY = "newer_than:{hours}h"
+UNREAD_SINCE_QUERY = "newer_than:{hours}h is:unread"
+
+# Access tokens this close to expiry are refreshed in the background
+CREDS_REFRESH_MARGIN = 300  # seconds
+
+# Held while a background token refresh is in flight, so only one runs at a time
+_prefetch_lock = threading.Lock()
+
+# REST endpoint and connection cap for the concurrent aiohttp fetch path
+GMAIL_MESSAGES_URL = "https://gmail.googleapis.com/gmail/v1/users/me/messages"
+ASYNC_FETCH_CONCURRENCY = 20
+
+logger = logging.getLogger(__name__)
+
+class _ThreadLocalHttp:
+    """
+    httplib2.Http isn't thread-safe, so each thread gets its own authorized
+    connection; the shared handler can then be used from the agent thread and the bot.
+    """
+
+    def __init__(self, factory, credentials):
+        self._factory = factory
+        self._local = threading.local()
+        self.credentials = credentials  # read by googleapiclient batch requests
+
+    def _http(self):
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._local.http = self._factory()
+        return http
+
+    def request(self, *args, **kwargs):
+        return self._http().request(*args, **kwargs)
+
+    def close(self):
+        http = getattr(self._local, 'http', None)
+        if http is not None:
+            http.close()
+
+class _LockedCredentials(Credentials):
+    """
+    Credentials whose refresh and per-request token use hold one lock, so the background
+    prefetch never refreshes them while a request thread is reading or refreshing them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+    def refresh(self, request):
+        with self.lock:
+            super().refresh(request)
+
+    def before_request(self, request, method, url, headers):
+        with self.lock:
+            super().before_request(request, method, url, headers)
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that decodes API responses with orjson instead of the stdlib json module"""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+        if self._data_wrapper and isinstance(body, dict) and 'data' in body:
+            body = body['data']
+        return body
+
+def _save_token(creds):
+    """Persist credentials so the next process start skips the OAuth flow"""
+    with open(TOKEN_FILE, 'w') as token:
+        token.write(creds.to_json())
+
+def _build_reply_raw(to, body):
+    """
+    Minimal RFC 5322 plain-text message, base64url-encoded for messages.send.
+    formataddr() encodes non-ASCII display names and the body is base64 so long lines stay valid.
+    """
+    headers = (
+        f"To: {formataddr(parseaddr(to))}\r\n"
+        "MIME-Version: 1.0\r\n"
+        'Content-Type: text/plain; charset="utf-8"\r\n'
+        "Content-Transfer-Encoding: base64\r\n\r\n"
+    )
+    message = headers.encode('ascii') + base64.encodebytes(body.encode('utf-8'))
+    return base64.urlsafe_b64encode(message).decode('ascii')
+
+def _extract_headers(headers):
+    """Map header name to value in one pass over a message's payload headers"""
+    return {h['name']: h['value'] for h in headers}
 
 class GmailHandler:
     """Minimal Gmail fetcher
@@ -12,6 +137,10 @@ class GmailHandler:
 
     def __init__(self):
         self.service = None
+        self.creds = None
+        self._label_cache = None  # user-created label dicts
+        self._label_ids = {}  # {lowercase label name: label id}
+        self._label_cache_ts = 0.0
         self.authenticate()
 
     def authenticate(self):
@@ -20,7 +149,7 @@ class GmailHandler:
 
         # Load existing token
         if os.path.exists(TOKEN_FILE):
-            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+            creds = _LockedCredentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
             print("creds loaded")
 
         # If no valid token, log in
@@ -30,120 +159,285 @@ class GmailHandler:
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
                 creds = flow.run_local_server(port=0)
-            # Save token
-            with open(TOKEN_FILE, 'w') as token:
-                token.write(creds.to_json())
+                creds = _LockedCredentials.from_authorized_user_info(orjson.loads(creds.to_json()), SCOPES)
+            _save_token(creds)
+
+        self.creds = creds
+        self.service = build('gmail', 'v1', http=self._build_http(creds), model=_OrjsonModel(), cache_discovery=False)
+
+    def _prefetch_token(self):
+        """Start a background token refresh if the access token expires within CREDS_REFRESH_MARGIN"""
+        creds = self.creds
+        if not creds or not creds.refresh_token or not creds.expiry:
+            return
+        remaining = (creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds()
+        if remaining > CREDS_REFRESH_MARGIN or not _prefetch_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._refresh_token, daemon=True).start()
+
+    def _refresh_token(self):
+        """Refresh the access token under the credentials lock and persist it; releases _prefetch_lock when done"""
+        try:
+            with self.creds.lock:
+                self.creds.refresh(Request())
+                _save_token(self.creds)
+        except Exception as e:
+            print(f"Background token refresh failed: {e}")
+        finally:
+            _prefetch_lock.release()
 
-        self.service = build('gmail', 'v1', credentials=creds)
+    def _build_http(self, creds):
+        """
+        One persistent, authorized httplib2 connection per thread for every API call.
+        httplib2 keeps the TLS connection to gmail.googleapis.com open between requests.
+        """
+        def factory():
+            http = httplib2.Http(timeout=GMAIL_HTTP_TIMEOUT)
+            http = set_user_agent(http, GMAIL_USER_AGENT)
+            return google_auth_httplib2.AuthorizedHttp(creds, http=http)
+        return _ThreadLocalHttp(factory, creds)
+
+    def get_labels(self, refresh=False, raise_errors=False):
+        """
+        Fetch and display only user-created Gmail labels.
+        The list is cached for LABEL_CACHE_TTL seconds unless refresh is True.
+        API errors return [] unless raise_errors is True.
+        """
+        if (not refresh and self._label_cache is not None
+                and time.monotonic() - self._label_cache_ts < LABEL_CACHE_TTL):
+            return list(self._label_cache)
 
-    def get_labels(self):
-        """Fetch and display only user-created Gmail labels"""
         try:
             results = self.service.users().labels().list(userId='me').execute()
             labels = results.get('labels', [])
 
             # Filter only user-created labels
             user_labels = [label for label in labels if label.get('type') == 'user']
+            self._set_label_cache(user_labels)
 
             if not user_labels:
-                print("No user-created labels found.")
+                logger.info("No user-created labels found.")
                 return []
 
-            print("Your Gmail Labels (created by you):")
-            for label in user_labels:
-                try:
-                    print(f" - {label['name']}")
-                except UnicodeEncodeError:
-                    # Fallback for Windows consoles that can't handle emojis
-                    safe_name = label['name'].encode('ascii', 'replace').decode('ascii')
-                    print(f" - {safe_name}")
-            print()
-            return user_labels
+            logger.debug("Gmail labels (created by you): %s", ", ".join(label['name'] for label in user_labels))
+            return list(user_labels)
 
         except Exception as e:
             print(f"Error fetching labels: {e}")
+            if raise_errors:
+                raise
             return []
+
+    def _set_label_cache(self, user_labels):
+        """Remember the user label list and its name -> id index"""
+        self._label_cache = user_labels
+        self._label_ids = {label['name'].lower(): label['id'] for label in user_labels}
+        self._label_cache_ts = time.monotonic()
         
-    def get_email_details(self, msg_id):
-        """Get full email details + labels"""
+    def get_email_details(self, msg_id, raise_errors=False):
+        """Get full email details + labels; API errors return None unless raise_errors is True"""
         try:
-            msg = self.service.users().messages().get(
-                userId='me', id=msg_id, format='full'
-            ).execute()
+            msg = self._message_request(msg_id).execute()
+            return self._parse_message(msg)
 
-            headers = msg['payload']['headers']
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), '(Unknown)')
-            snippet = msg.get('snippet', '')
-            labels = msg.get('labelIds', [])
+        except Exception as e:
+            print(f"Error reading email: {e}")
+            if raise_errors:
+                raise
+            return None
 
+    def _message_request(self, msg_id):
+        """messages.get request for just the metadata the agent uses (no body parts)"""
+        return self.service.users().messages().get(
+            userId='me', id=msg_id, format='metadata',
+            metadataHeaders=MESSAGE_HEADERS, fields=MESSAGE_FIELDS
+        )
+
+    def get_email_details_batch(self, msg_ids):
+        """
+        Get details for many emails with one batch HTTP request per BATCH_GET_LIMIT ids.
+        Emails whose batched call fails are retried one by one.
+        """
+        return [email for chunk in self.iter_email_details_batches(msg_ids) for email in chunk]
+
+    def iter_email_details_batches(self, msg_ids):
+        """Yield the parsed emails of each BATCH_GET_LIMIT-sized batch request as soon as it completes"""
+        for start in range(0, len(msg_ids), BATCH_GET_LIMIT):
+            chunk = msg_ids[start:start + BATCH_GET_LIMIT]
+            details = {}
+            failed = []
+
+            def on_response(request_id, response, exception):
+                if exception is not None:
+                    failed.append(request_id)
+                    return
+                try:
+                    details[request_id] = self._parse_message(response)
+                except Exception as e:
+                    print(f"Error reading email: {e}")
+
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for msg_id in chunk:
+                batch.add(self._message_request(msg_id), request_id=msg_id)
             try:
-                print(f"From: {sender}")
-                print(f"   Subject: {subject}")
-                print(f"   Labels: {', '.join(labels) if labels else '(No Labels)'}")
-                print(f"   Snippet: {snippet}...\n")
-            except UnicodeEncodeError:
-                # Fallback for Windows consoles
-                safe_sender = sender.encode('ascii', 'replace').decode('ascii')
-                safe_subject = subject.encode('ascii', 'replace').decode('ascii')
-                print(f"From: {safe_sender}")
-                print(f"   Subject: {safe_subject}")
+                batch.execute()
+            except Exception as e:
+                print(f"Batch fetch failed, fetching {len(chunk)} emails one by one: {e}")
+                failed.extend(msg_id for msg_id in chunk if msg_id not in details and msg_id not in failed)
 
+            if failed:
+                for email in self.get_email_details_concurrently(failed):
+                    details[email['id']] = email
 
-            return {
-                "id": msg_id, 
-                "threadId": msg.get('threadId'),
-                "from": sender, 
-                "subject": subject, 
-                "labels": labels, 
-                "snippet": snippet
-            }
+            yield [details[msg_id] for msg_id in chunk if msg_id in details]
 
-        except Exception as e:
-            print(f"Error reading email: {e}")
-            return None
+    def get_email_details_concurrently(self, msg_ids):
+        """
+        Get details for many emails with overlapping aiohttp requests.
+        Falls back to one-by-one fetching when called from a running event loop.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                return asyncio.run(self._aget_many(msg_ids))
+            except Exception as e:
+                print(f"Concurrent fetch failed, fetching {len(msg_ids)} emails one by one: {e}")
+        emails = []
+        for msg_id in msg_ids:
+            details = self.get_email_details(msg_id)
+            if details:
+                emails.append(details)
+        return emails
 
-    def get_emails_since(self, hours: int = 24, max_results: int = 50, unread_only: bool = False):
-        """Fetch emails received in the last 'hours' hours"""
+    async def _aget_many(self, msg_ids):
+        """Fetch and parse messages concurrently over one pooled aiohttp session"""
+        headers = {"Authorization": f"Bearer {self._access_token()}"}
+        connector = aiohttp.TCPConnector(limit=ASYNC_FETCH_CONCURRENCY)
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            responses = await asyncio.gather(
+                *(self._aget_email(session, msg_id) for msg_id in msg_ids),
+                return_exceptions=True
+            )
+
+        emails = []
+        for msg_id, response in zip(msg_ids, responses):
+            if isinstance(response, Exception):
+                print(f"Error reading email {msg_id}: {response}")
+                continue
+            emails.append(self._parse_message(response))
+        return emails
+
+    async def _aget_email(self, session, msg_id):
+        """GET one message's metadata"""
+        params = [("format", "metadata"), ("fields", MESSAGE_FIELDS)]
+        params += [("metadataHeaders", header) for header in MESSAGE_HEADERS]
+        async with session.get(f"{GMAIL_MESSAGES_URL}/{msg_id}", params=params) as resp:
+            resp.raise_for_status()
+            return await resp.json(loads=orjson.loads)
+
+    def _access_token(self):
+        """Current OAuth access token, refreshed first if it has expired"""
+        if not self.creds.valid:
+            self.creds.refresh(Request())
+        return self.creds.token
+
+    def _parse_message(self, msg):
+        """Extract the fields the agent uses from a messages.get response"""
+        hdr = _extract_headers(msg['payload'].get('headers', []))
+        subject = hdr.get('Subject', '(No Subject)')
+        sender = hdr.get('From', '(Unknown)')
+        snippet = msg.get('snippet', '')
+        labels = msg.get('labelIds', [])
+
+        logger.debug("From: %s | Subject: %s | Labels: %s | Snippet: %s",
+                     sender, subject, ', '.join(labels) if labels else '(No Labels)', snippet)
+
+        return {
+            "id": msg['id'], 
+            "threadId": msg.get('threadId'),
+            "from": sender, 
+            "subject": subject, 
+            "labels": labels, 
+            "snippet": snippet
+        }
+
+    def get_emails_since(self, hours: int = 24, max_results: int = 50, unread_only: bool = False, skip_ids=None):
+        """
+        Fetch emails received in the last 'hours' hours.
+        Message IDs in skip_ids are dropped before any message details are fetched.
+        """
+        return [email for chunk in self.iter_emails_since(hours, max_results, unread_only, skip_ids) for email in chunk]
+
+    def iter_emails_since(self, hours: int = 24, max_results: int = 50, unread_only: bool = False, skip_ids=None):
+        """
+        Like get_emails_since, but yields emails one batch request (up to BATCH_GET_LIMIT) at a time
+        so callers can process the first batch while later ones are still unfetched.
+        """
         try:
-            if unread_only:
-                query = f"newer_than:{hours}h is:unread"
-            else:
-                query = f"newer_than:{hours}h"
+            query = (UNREAD_SINCE_QUERY if unread_only else SINCE_QUERY).format(hours=hours)
+            msg_ids = self._list_message_ids(max_results, labelIds=['INBOX'], q=query)
+            if not msg_ids:
+                logger.info("No emails found in the last %d hours.", hours)
+                return
+
+            if skip_ids:
+                msg_ids = [msg_id for msg_id in msg_ids if msg_id not in skip_ids]
+                if not msg_ids:
+                    logger.info("No new emails in the last %d hours.", hours)
+                    return
+
+            logger.info("Found %d emails from the last %d hours", len(msg_ids), hours)
+            for chunk in self.iter_email_details_batches(msg_ids):
+                if chunk:
+                    yield chunk
+
+        except Exception as e:
+            print(f"Error fetching emails: {e}")
+
+    def _list_message_ids(self, max_results, **params):
+        """List up to max_results message ids, following nextPageToken across pages"""
+        self._prefetch_token()
+        msg_ids = []
+        page_token = None
+        while len(msg_ids) < max_results:
             results = self.service.users().messages().list(
                 userId='me',
-                labelIds=['INBOX'],
-                q=query,
-                maxResults=max_results
+                maxResults=min(max_results - len(msg_ids), LIST_PAGE_LIMIT),
+                pageToken=page_token,
+                fields=MESSAGE_LIST_FIELDS,
+                **params
             ).execute()
+            msg_ids.extend(msg['id'] for msg in results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        return msg_ids[:max_results]
 
-            messages = results.get('messages', [])
-            if not messages:
-                print(f"No emails found in the last {hours} hours.")
-                return []
-
-            print(f"Found {len(messages)} emails from the last {hours} hours:\n")
-            emails = []
-            for msg in messages:
-                details = self.get_email_details(msg['id'])
-                if details:
-                    emails.append(details)
-            return emails
+    def watch_inbox(self, topic_name):
+        """Ask Gmail to publish INBOX changes to a Cloud Pub/Sub topic; returns {'historyId', 'expiration'}"""
+        try:
+            return self.service.users().watch(
+                userId='me',
+                body={'topicName': topic_name, 'labelIds': ['INBOX']}
+            ).execute()
+        except Exception as e:
+            print(f"Error starting Gmail watch: {e}")
+            return None
 
+    def stop_watch(self):
+        """Stop Gmail push notifications for this mailbox"""
+        try:
+            self.service.users().stop(userId='me').execute()
         except Exception as e:
-            print(f"Error fetching emails: {e}")
-            return []
+            print(f"Error stopping Gmail watch: {e}")
 
     def check_label_exists(self, label_name):
         """Check if a label exists"""
-        labels = self.get_labels()
-        for label in labels:
-            if label['name'].lower() == label_name.lower():
-                return True
-        return False
+        return self._resolve_label_id(label_name) is not None
     
     def create_label(self, label_name):
-        """Create a new label"""
+        """Create a new label, returning the existing one if the name is already taken"""
         label_body = {
             'name': label_name,
             'labelListVisibility': 'labelShow',
@@ -155,87 +449,79 @@ class GmailHandler:
                 body=label_body
             ).execute()
             print(f"Label '{label_name}' created.")
+            if self._label_cache is not None:
+                self._label_cache.append(label)
+                self._label_ids[label['name'].lower()] = label['id']
             return label
+        except HttpError as e:
+            if e.resp.status == 409:
+                # Label already exists (e.g. created after labels were last listed)
+                for label in self.get_labels(refresh=True):
+                    if label['name'].lower() == label_name.lower():
+                        return label
+            print(f"Error creating label: {e}")
+            return None
         except Exception as e:
             print(f"Error creating label: {e}")
             return None
     
     def get_label_statistics(self):
-        """Get email count statistics for all user-created labels"""
+        """
+        Get email count statistics for all user-created labels, one batch request per BATCH_GET_LIMIT labels.
+        Raises on Gmail API errors so callers can tell a failure from an account without labels.
+        """
         try:
-            results = self.service.users().labels().list(userId='me').execute()
-            labels = results.get('labels', [])
-            
-            # Filter only user-created labels
-            user_labels = [label for label in labels if label.get('type') == 'user']
-            
-            label_stats = {}
-            for label in user_labels:
-                label_name = label['name']
-                label_id = label['id']
-                
-                # Get message count for this label
-                try:
-                    label_detail = self.service.users().labels().get(
-                        userId='me', 
-                        id=label_id
-                    ).execute()
-                    
-                    # Get total messages with this label
-                    message_count = label_detail.get('messagesTotal', 0)
-                    label_stats[label_name] = message_count
-                except Exception as e:
-                    print(f"Error getting stats for label '{label_name}': {e}")
-                    label_stats[label_name] = 0
+            user_labels = self.get_labels(raise_errors=True)
+            counts = {}
+
+            def on_response(label_id, response, exception):
+                if exception is not None:
+                    print(f"Error getting stats for label '{label_id}': {exception}")
+                    return
+                # Get total messages with this label
+                counts[label_id] = response.get('messagesTotal', 0)
+
+            labels = self.service.users().labels()
+            for start in range(0, len(user_labels), BATCH_GET_LIMIT):
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for label in user_labels[start:start + BATCH_GET_LIMIT]:
+                    batch.add(labels.get(userId='me', id=label['id'], fields=LABEL_STATS_FIELDS),
+                              request_id=label['id'])
+                batch.execute()
             
-            return label_stats
+            return {label['name']: counts.get(label['id'], 0) for label in user_labels}
         except Exception as e:
             print(f"Error fetching label statistics: {e}")
-            return {}
+            raise
     
-    def get_emails_by_label(self, label_name, max_results=10):
-        """Fetch emails for a specific label"""
+    def get_emails_by_label(self, label_name, max_results=10, label_id=None):
+        """
+        Fetch emails for a specific label.
+        Pass label_id when it is already known to skip resolving the name.
+        Returns None if the label doesn't exist and raises on Gmail API errors.
+        """
         try:
-            # First, get the label ID
-            labels = self.get_labels()
-            label_id = None
-            for label in labels:
-                if label['name'].lower() == label_name.lower():
-                    label_id = label['id']
-                    break
-            
             if not label_id:
-                print(f"Label '{label_name}' not found.")
-                return None
+                label_id = self._resolve_label_id(label_name, raise_errors=True)
+                if not label_id:
+                    print(f"Label '{label_name}' not found.")
+                    return None
             
             # Fetch messages with this label
-            results = self.service.users().messages().list(
-                userId='me',
-                labelIds=[label_id],
-                maxResults=max_results
-            ).execute()
-            
-            messages = results.get('messages', [])
-            if not messages:
+            msg_ids = self._list_message_ids(max_results, labelIds=[label_id])
+            if not msg_ids:
                 return []
             
-            # Get details for each message
-            emails = []
-            for msg in messages:
-                details = self.get_email_details(msg['id'])
-                if details:
-                    emails.append(details)
-            
-            return emails
-            return emails
+            # Get details for all messages in batched requests
+            return self.get_email_details_batch(msg_ids)
         except Exception as e:
-            # Safe print for error message which might contain the label name
-            try:
-                print(f"Error fetching emails for label '{label_name}': {e}")
-            except UnicodeEncodeError:
-                safe_label = label_name.encode('ascii', 'replace').decode('ascii')
-                print(f"Error fetching emails for label '{safe_label}': {e}")
-            return None
+            print(f"Error fetching emails for label '{label_name}': {e}")
+            raise
+
+    def _resolve_label_id(self, label_name, raise_errors=False):
+        """Look up a user label's id by name (case-insensitive) from the label cache"""
+        self.get_labels(raise_errors=raise_errors)
+        return self._label_ids.get(label_name.lower())
 
     def get_thread_details(self, thread_id):
         """Get details about a thread, specifically message count"""
@@ -252,22 +538,10 @@ class GmailHandler:
             return None
 
     def send_reply(self, thread_id, to, subject, body):
-        """Send a reply to a thread"""
+        """Send a reply to a thread; raises on Gmail API errors"""
         try:
-            from email.mime.text import MIMEText
-            import base64
-
-            message = MIMEText(body)
-            message['to'] = to
-            # message['subject'] = subject # Omit subject for threading to work better naturally
-            
-            # If replying, we should ideally set References and In-Reply-To headers
-            # But for simplicity, just setting the threadId in the API call usually groups it.
-            # To be more correct, we'd fetch the last message in thread and set headers.
-            # For now, let's rely on Gmail API's threadId grouping.
-            
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-            body = {'raw': raw_message, 'threadId': thread_id}
+            # Subject is omitted; threadId alone keeps the reply in the same Gmail thread
+            body = {'raw': _build_reply_raw(to, body), 'threadId': thread_id}
             
             sent_message = self.service.users().messages().send(
                 userId='me', 
@@ -278,4 +552,26 @@ class GmailHandler:
             return sent_message
         except Exception as e:
             print(f"Error sending reply: {e}")
-            return None
+            raise
+
+
+# Global handler instance
+_handler_instance = None
+_handler_lock = threading.Lock()
+
+def get_gmail_handler() -> GmailHandler:
+    """Get or create the shared, authenticated GmailHandler"""
+    global _handler_instance
+    handler = _handler_instance
+    if handler is None:
+        with _handler_lock:
+            if _handler_instance is None:
+                _handler_instance = GmailHandler()
+            handler = _handler_instance
+    return handler
+
+def reset_gmail_handler():
+    """Forget the shared handler so the next get_gmail_handler() re-authenticates from the token file"""
+    global _handler_instance
+    with _handler_lock:
+        _handler_instance = None
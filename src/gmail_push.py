@@ -0,0 +1,100 @@
+"""
+Optional Gmail push notifications via Cloud Pub/Sub.
+When GMAIL_PUBSUB_TOPIC and GMAIL_PUBSUB_SUBSCRIPTION are set and google-cloud-pubsub
+is installed, the polling loop sleeps until Gmail reports an inbox change instead of
+waking up every POLLING_INTERVAL. A notification only wakes the loop; the cycle then
+lists the polling window as usual and skips messages it has already processed.
+"""
+import asyncio
+import logging
+import time
+from .config import GMAIL_PUBSUB_TOPIC, GMAIL_PUBSUB_SUBSCRIPTION, GMAIL_WATCH_RENEW_INTERVAL
+
+try:
+    from google.cloud import pubsub_v1
+except ImportError:  # push is optional; polling works without it
+    pubsub_v1 = None
+
+logger = logging.getLogger(__name__)
+
+
+class GmailPushListener:
+    """Keeps a Gmail watch() alive and sets wake_event whenever Pub/Sub delivers a notification"""
+
+    def __init__(self, gmail_handler, topic: str, subscription: str):
+        self.gmail = gmail_handler
+        self.topic = topic
+        self.subscription = subscription
+        self.wake_event = asyncio.Event()
+        self._loop = None
+        self._subscriber = None
+        self._future = None
+        self._watch_ts = 0.0
+
+    def start(self, loop) -> bool:
+        """Register the Gmail watch and start the Pub/Sub subscriber thread"""
+        self._loop = loop
+        if not self.renew_watch(force=True):
+            return False
+        try:
+            self._subscriber = pubsub_v1.SubscriberClient()
+            self._future = self._subscriber.subscribe(self.subscription, callback=self._on_message)
+        except Exception:
+            # Don't leave Gmail publishing to a topic nobody is listening on
+            self.stop()
+            raise
+        return True
+
+    def renew_watch(self, force: bool = False) -> bool:
+        """Re-issue watch() before Gmail's 7-day expiry"""
+        if not force and time.monotonic() - self._watch_ts < GMAIL_WATCH_RENEW_INTERVAL:
+            return True
+        response = self.gmail.watch_inbox(self.topic)
+        if not response:
+            return False
+        self._watch_ts = time.monotonic()
+        return True
+
+    def _on_message(self, message):
+        """Pub/Sub callback (runs on a subscriber thread)"""
+        message.ack()
+        logger.debug("Gmail push notification received")
+        self._loop.call_soon_threadsafe(self.wake_event.set)
+
+    def stop(self):
+        """Stop the subscriber and the Gmail watch"""
+        if self._future:
+            self._future.cancel()
+            self._future = None
+        if self._subscriber:
+            self._subscriber.close()
+            self._subscriber = None
+        self.gmail.stop_watch()
+
+
+def create_push_listener(gmail_handler, loop):
+    """
+    Start a push listener if Pub/Sub is configured
+
+    Args:
+        gmail_handler: Authenticated GmailHandler
+        loop: Event loop whose wake_event the subscriber thread sets
+
+    Returns:
+        A started GmailPushListener, or None to fall back to timed polling
+    """
+    if not (GMAIL_PUBSUB_TOPIC and GMAIL_PUBSUB_SUBSCRIPTION):
+        return None
+    if pubsub_v1 is None:
+        print("[WARN] GMAIL_PUBSUB_TOPIC is set but google-cloud-pubsub is not installed; using timed polling.")
+        return None
+
+    listener = GmailPushListener(gmail_handler, GMAIL_PUBSUB_TOPIC, GMAIL_PUBSUB_SUBSCRIPTION)
+    try:
+        if listener.start(loop):
+            print(f"[OK] Gmail push notifications enabled via {GMAIL_PUBSUB_SUBSCRIPTION}")
+            return listener
+    except Exception as e:
+        print(f"[ERROR] Could not start Gmail push notifications: {e}")
+    print("[WARN] Falling back to timed polling.")
+    return None
@@ -1,20 +1,22 @@
+import asyncio
 import os
-import time
+import signal
 import sys
-import threading
+import traceback
 from langchain_google_genai import ChatGoogleGenerativeAI
-from src.config import GOOGLE_API_KEY, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, POLLING_INTERVAL
-from src.gmail_client import GmailHandler
+from src.config import GOOGLE_API_KEY, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, POLLING_INTERVAL, configure_console
+from src.gmail_client import get_gmail_handler
 from src.categorizer import EmailCategorizer
-from src.agent import GmailLLMAgent
+from src.agent import GmailLLMAgent, get_telegram_session
+from src.gmail_push import create_push_listener
 
 def initialize_agent():
     """Initialize and return the agent instance"""
     print("Initializing Email Agent...")
     
-    # Initialize Gmail handler
+    # Reuse the process-wide Gmail handler (token, service and connections) across agent restarts
     try:
-        gmail_handler = GmailHandler()
+        gmail_handler = get_gmail_handler()
     except Exception as e:
         print(f"Failed to initialize Gmail handler: {e}")
         return None
@@ -32,73 +34,140 @@ def initialize_agent():
     categorizer = EmailCategorizer(llm)
 
     # Create LLM Agent
-    agent = GmailLLMAgent(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, gmail_handler, categorizer)
+    agent = GmailLLMAgent(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, gmail_handler, categorizer,
+                          http_session=get_telegram_session())
     return agent
 
-def run_polling_loop(stop_event=None, initial_mode="monitor"):
+def _run_backfill(agent):
     """
-    Run the agent polling loop until stop_event is set
+    Process all emails from the last 24 hours, read or unread
+    
+    Returns:
+        True if the backfill completed and monitoring should continue
+    """
+    print("[INFO] Starting 24h Backfill (Read & Unread)...")
+    try:
+        agent.process_emails(hours=24, max_results=20, unread_only=False)
+        print("[OK] Backfill complete. Switching to monitoring mode...")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Critical error during backfill!")
+        print(f"[ERROR] Error type: {type(e).__name__}")
+        print(f"[ERROR] Error message: {e}")
+        print("[ERROR] Full traceback:")
+        traceback.print_exc()
+        print("[ERROR] Agent will stop due to backfill error.")
+        return False
+
+def _run_cycle(agent, cycle_count):
+    """Run one monitoring cycle, logging (not raising) processing errors"""
+    print(f"[CYCLE {cycle_count}] Processing emails...")
+    try:
+        # Process emails (Monitor mode: unread only)
+        agent.process_emails(hours=24, max_results=10, unread_only=True)
+        print(f"[CYCLE {cycle_count}] Complete. Sleeping for {POLLING_INTERVAL} seconds...")
+    except Exception as e:
+        print(f"[ERROR] Error during processing cycle {cycle_count}: {e}")
+        traceback.print_exc()
+
+async def async_polling_loop(initial_mode="monitor", tick_cb=None, stop_event=None):
+    """
+    Run the agent polling loop as an asyncio task until it is cancelled or stop_event is set.
+    Blocking Gmail/LLM work runs in a worker thread so the event loop stays responsive.
     
     Args:
-        stop_event: Threading event to signal stop
         initial_mode: "monitor" (default) or "backfill"
+        tick_cb: Optional callable invoked at the start of every processing run
+        stop_event: Optional asyncio.Event; setting it ends the loop after the current cycle
     """
-    print(f"[DEBUG] run_polling_loop started with mode={initial_mode}")
-    agent = initialize_agent()
+    print(f"[DEBUG] async_polling_loop started with mode={initial_mode}")
+    agent = await asyncio.to_thread(initialize_agent)
     if not agent:
         print("[ERROR] Agent initialization failed.")
         return
 
     print(f"[OK] Agent started. Mode: {initial_mode}. Polling interval: {POLLING_INTERVAL} seconds")
+    push = await asyncio.to_thread(create_push_listener, agent.gmail, asyncio.get_running_loop())
+    wake_events = [event for event in (stop_event, push and push.wake_event) if event]
     
-    # Handle backfill if requested
-    if initial_mode == "backfill":
-        print("[INFO] Starting 24h Backfill (Read & Unread)...")
-        try:
-            agent.process_emails(hours=24, max_results=20, unread_only=False)
-            print("[OK] Backfill complete. Switching to monitoring mode...")
-        except Exception as e:
-            print(f"[ERROR] Critical error during backfill!")
-            print(f"[ERROR] Error type: {type(e).__name__}")
-            print(f"[ERROR] Error message: {e}")
-            import traceback
-            print("[ERROR] Full traceback:")
-            traceback.print_exc()
-            print("[ERROR] Agent will stop due to backfill error.")
-            return  # Exit the function, which will stop the agent
+    try:
+        # Handle backfill if requested
+        if initial_mode == "backfill":
+            if tick_cb:
+                tick_cb()
+            if not await _run_agent_work(agent, _run_backfill, agent):
+                return
+        
+        # Main polling loop
+        print("[INFO] Entering main polling loop...")
+        cycle_count = 0
+        while not (stop_event and stop_event.is_set()):
+            cycle_count += 1
+            if tick_cb:
+                tick_cb()
+            if push:
+                push.wake_event.clear()
+                await asyncio.to_thread(push.renew_watch)
+            await _run_agent_work(agent, _run_cycle, agent, cycle_count)
             
-    # Main polling loop
-    print("[INFO] Entering main polling loop...")
-    cycle_count = 0
-    while True:
-        if stop_event and stop_event.is_set():
-            print("[INFO] Stop event received. Stopping agent...")
-            break
+            # Wait for the next cycle, waking early on a stop request or Gmail push notification
+            if wake_events:
+                await _wait_for_any(wake_events, POLLING_INTERVAL)
+            else:
+                await asyncio.sleep(POLLING_INTERVAL)
+        print("[INFO] Stop event received. Stopping agent...")
+    except asyncio.CancelledError:
+        print("[INFO] Stop requested. Stopping agent...")
+        raise
+    finally:
+        if push:
+            await asyncio.to_thread(push.stop)
+        print("[INFO] async_polling_loop ended.")
+
+async def _run_agent_work(agent, func, *args):
+    """
+    Run blocking agent work in a worker thread. If the caller is cancelled, ask the agent
+    to stop after its current batch and wait for the thread, so no cycle outlives the loop.
+    """
+    work = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(work)
+    except asyncio.CancelledError:
+        agent.stop_requested.set()
+        print("[INFO] Waiting for the current batch to finish...")
+        while not work.done():
+            try:
+                await asyncio.wait([work])
+            except asyncio.CancelledError:
+                pass  # already stopping; a repeated cancel must not orphan the thread
+        raise
+
+async def _wait_for_any(events, timeout):
+    """Wait until any of the asyncio events is set or timeout seconds pass"""
+    waiters = [asyncio.ensure_future(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
 
-        cycle_count += 1
-        print(f"[CYCLE {cycle_count}] Processing emails...")
+async def _run_until_signalled():
+    """Run the polling loop until SIGINT/SIGTERM sets the stop event"""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
         try:
-            # Process emails (Monitor mode: unread only)
-            agent.process_emails(hours=24, max_results=10, unread_only=True)
-            print(f"[CYCLE {cycle_count}] Complete. Sleeping for {POLLING_INTERVAL} seconds...")
-        except Exception as e:
-            print(f"[ERROR] Error during processing cycle {cycle_count}: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # Sleep in short intervals to check for stop_event
-        for i in range(POLLING_INTERVAL):
-            if stop_event and stop_event.is_set():
-                print("[INFO] Stop event detected during sleep.")
-                break
-            time.sleep(1)
-    
-    print("[INFO] run_polling_loop ended.")
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+    await async_polling_loop(stop_event=stop_event)
 
 def main():
     """Entry point for command line execution"""
+    configure_console()
     try:
-        run_polling_loop()
+        asyncio.run(_run_until_signalled())
+        print("\nEmail Agent stopped.")
     except KeyboardInterrupt:
         print("\nStopping Email Agent...")
         sys.exit(0)
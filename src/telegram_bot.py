@@ -3,47 +3,249 @@ Telegram bot handler for controlling the email agent.
 Handles incoming commands like /start, /stop, and /status.
 """
 import asyncio
+import functools
+import hashlib
 import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from heapq import nlargest
+from operator import itemgetter
+import httplib2
+from google.auth.exceptions import RefreshError, TransportError
+from googleapiclient.errors import HttpError
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
-from src.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, GOOGLE_API_KEY, ANALYTICS_CHART_DIR
+from telegram.ext import AIORateLimiter, Application, CallbackQueryHandler, CommandHandler, ContextTypes, MessageHandler, filters
+from src.config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, GOOGLE_API_KEY, ANALYTICS_CHART_DIR,
+    TELEGRAM_LABEL_STATS_TTL, TELEGRAM_LABEL_EMAILS_TTL, TELEGRAM_MAX_MESSAGES_PER_SECOND,
+    TELEGRAM_MAX_LABEL_BUTTONS, TELEGRAM_POLL_TIMEOUT, TELEGRAM_MESSAGE_CHUNK_SIZE,
+    TELEGRAM_GMAIL_MAX_BACKOFF, TELEGRAM_REPLY_CACHE_SIZE
+)
 from src.agent_controller import start_agent, stop_agent, get_agent_status
-from src.gmail_client import GmailHandler
+from src.gmail_client import get_gmail_handler, reset_gmail_handler
 from src.categorizer import EmailCategorizer
-from src.analytics_engine import AnalyticsEngine
+from src.analytics_engine import get_analytics_engine
 from src.analytics_visualizer import AnalyticsVisualizer
+from src.bot_state import PersistentChatDict, get_bot_state_store
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+# A label's email list rendered once per fetch: MarkdownV2 cards and their reply keyboard
+_LabelEmailsView = namedtuple("_LabelEmailsView", "count text reply_markup")
+
+class _GmailCoolingDown(Exception):
+    """Raised instead of calling Gmail while the bot backs off after failures"""
+
+    def __init__(self, remaining: float):
+        super().__init__(f"Gmail temporarily unavailable, try again in {max(1, round(remaining))}s")
+
+
+def _is_gmail_outage(error: Exception) -> bool:
+    """True for transport, auth and server-side Gmail failures; request errors (404, 400) and bugs don't count"""
+    if isinstance(error, HttpError):
+        return error.resp.status >= 500 or error.resp.status == 401
+    return isinstance(error, (OSError, httplib2.HttpLib2Error, RefreshError, TransportError))
+
+
+# Characters Telegram's MarkdownV2 requires to be backslash-escaped in plain text
+_MD_ESCAPE_RE = re.compile(r"([_*\[\]()~`>#+\-=|{}.!\\])")
+
+
+def _escape_md(text: str) -> str:
+    """Escape text for literal display in a MarkdownV2 message"""
+    return _MD_ESCAPE_RE.sub(r"\\\1", text)
+
+
+def _email_card(i: int, email: dict) -> str:
+    """MarkdownV2 summary of one email for a label's email list"""
+    subject = _escape_md(email.get('subject', '(No Subject)'))
+    sender = _escape_md(email.get('from', '(Unknown)'))
+    snippet = _escape_md(email.get('snippet', ''))
+    return f"*{i}\\. {subject}*\nFrom: {sender}\n{snippet}\\.\\.\\."
+
+
+def _split_message(text: str, limit: int = TELEGRAM_MESSAGE_CHUNK_SIZE):
+    """
+    Split text into chunks of at most `limit` characters at line boundaries,
+    so Markdown entities that open and close on one line stay intact.
+    Only a single line longer than `limit` is cut mid-line.
+    """
+    chunks, buf, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        if size + len(line) > limit and buf:
+            chunks.append("".join(buf))
+            buf, size = [], 0
+        while len(line) > limit:
+            chunks.append(line[:limit])
+            line = line[limit:]
+        buf.append(line)
+        size += len(line)
+    if buf:
+        chunks.append("".join(buf))
+    return chunks
+
+
+async def _reply_chunked(message_obj, text: str, reply_markup=None, **kwargs):
+    """Send text as consecutive messages, attaching reply_markup to the last one"""
+    chunks = _split_message(text) or [text]
+    for chunk in chunks[:-1]:
+        await message_obj.reply_text(chunk, **kwargs)
+    await message_obj.reply_text(chunks[-1], reply_markup=reply_markup, **kwargs)
+
+
+def _authorized_only(handler):
+    """
+    Decorator for update handlers: ignore updates from chats other than the configured one
+    and report any exception the handler lets escape instead of dropping it silently.
+    """
+    @functools.wraps(handler)
+    async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if not self._authorized(update):
+            if update.callback_query:
+                await update.callback_query.answer()
+            await update.effective_message.reply_text("⛔ Unauthorized access")
+            return
+        try:
+            return await handler(self, update, context)
+        except Exception as e:
+            print(f"Error in {handler.__name__}: {e}")
+            await update.effective_message.reply_text(f"❌ Error: {e}")
+    return wrapper
+
+
 class TelegramBotHandler:
     """Handles Telegram bot commands for agent control"""
     
     def __init__(self, token: str, authorized_chat_id: str):
         self.token = token
         self.authorized_chat_id = authorized_chat_id
+        # Chat ids arrive as ints; convert the configured id once instead of str()-ing every update
+        try:
+            self._authorized_chat_id_int = int(authorized_chat_id)
+        except (TypeError, ValueError):
+            self._authorized_chat_id_int = None  # unset or malformed: nobody is authorized
         self.application = None
-        self.drafts = {} # Store drafts: {chat_id: {'thread_id': ..., 'to': ..., 'subject': ..., 'body': ..., 'original_content': ...}}
-        self.user_states = {} # Store user states: {chat_id: {'state': ..., 'data': ...}}
-        
-        # Initialize LLM and Categorizer for replies
-        if GOOGLE_API_KEY:
-            self.llm = ChatGoogleGenerativeAI(google_api_key=GOOGLE_API_KEY, model="gemini-2.5-flash")
-            self.categorizer = EmailCategorizer(self.llm)
-            
-            # Initialize analytics engine and visualizer
-            self.analytics_engine = AnalyticsEngine(self.llm)
-            self.analytics_visualizer = AnalyticsVisualizer(self.analytics_engine, ANALYTICS_CHART_DIR)
-        else:
-            self.categorizer = None
-            self.analytics_engine = None
-            self.analytics_visualizer = None
+        # Drafts and prompts are written through to SQLite so they survive a restart
+        state_store = get_bot_state_store()
+        self.drafts = PersistentChatDict(state_store, 'drafts') # Store drafts: {chat_id: {'msg_id': ..., 'thread_id': ..., 'to': ..., 'subject': ..., 'body': ...}}
+        self.user_states = PersistentChatDict(state_store, 'user_states') # Store user states: {chat_id: {'state': ..., 'data': ...}}
+        self._gmail = None  # shared GmailHandler, built on first use
+        self._gmail_lock = asyncio.Lock()
+        self._gmail_failures = 0  # consecutive failed Gmail calls
+        self._gmail_cooldown_until = 0.0  # monotonic time before which Gmail calls fail fast
+        self._labels_view = None  # (monotonic timestamp, label stats, message, reply_markup) for /labels
+        self._label_names_by_id = {}  # {short id used in "v:<id>" callback data: label name}
+        self._emails_cache = {}  # {lowercase label name: (monotonic timestamp, _LabelEmailsView)}
+        self._emails_inflight = {}  # {lowercase label name: asyncio.Future of the running fetch}
+        self._reply_cache = OrderedDict()  # {(msg_id, instructions digest): draft body}, least recently used first
+        # {callback data prefix: handler(update, text after the first ":")}
+        self._callback_handlers = {
+            "start": self._start_callback,
+            "v": self._view_label_callback,
+            "view": self.show_emails_for_label,  # buttons sent before short ids were introduced
+            "reply": self.handle_reply_callback,
+            "send": self.handle_send_callback,
+            "regenerate": self.handle_regenerate_callback,
+            "cancel": self.handle_cancel_callback,
+            "edit": self.handle_edit_callback,
+        }
+        
+        # LLM, categorizer and analytics are built on first use (see the properties below)
+        self._llm = None
+        self._categorizer = None
+        self._analytics_engine = None
+        self._analytics_visualizer = None
+    
+    @property
+    def llm(self):
+        """Gemini chat model shared by drafting and analytics, or None without GOOGLE_API_KEY"""
+        if self._llm is None and GOOGLE_API_KEY:
+            self._llm = ChatGoogleGenerativeAI(google_api_key=GOOGLE_API_KEY, model="gemini-2.5-flash")
+        return self._llm
+    
+    @property
+    def categorizer(self):
+        """Categorizer used to draft replies, or None if the LLM isn't configured"""
+        if self._categorizer is None and self.llm:
+            self._categorizer = EmailCategorizer(self.llm)
+        return self._categorizer
+    
+    @property
+    def analytics_engine(self):
+        """Analytics engine, or None if the LLM isn't configured"""
+        if self._analytics_engine is None and self.llm:
+            self._analytics_engine = get_analytics_engine(self.llm)
+        return self._analytics_engine
     
+    @property
+    def analytics_visualizer(self):
+        """Chart generator for the analytics commands, or None if the LLM isn't configured"""
+        if self._analytics_visualizer is None and self.analytics_engine:
+            self._analytics_visualizer = AnalyticsVisualizer(self.analytics_engine, ANALYTICS_CHART_DIR)
+        return self._analytics_visualizer
+    
+    def _authorized(self, update: Update) -> bool:
+        """True if the update comes from the configured chat"""
+        return update.effective_chat.id == self._authorized_chat_id_int
+
+    async def _get_gmail(self):
+        """
+        Return the cached GmailHandler, authenticating off the event loop on first use.
+        Concurrent callers share one authentication; those queued behind a failed attempt fail fast.
+        """
+        if self._gmail is None:
+            async with self._gmail_lock:
+                if self._gmail is None:
+                    self._check_gmail_cooldown()
+                    self._gmail = await asyncio.to_thread(get_gmail_handler)
+        return self._gmail
+
+    def _reset_gmail(self):
+        """Drop the cached GmailHandler so the next command re-authenticates"""
+        self._gmail = None
+        reset_gmail_handler()
+
+    def _check_gmail_cooldown(self):
+        """Raise _GmailCoolingDown while the bot is backing off from Gmail"""
+        remaining = self._gmail_cooldown_until - time.monotonic()
+        if remaining > 0:
+            raise _GmailCoolingDown(remaining)
+
+    def _invalidate_label_caches(self):
+        """Expire cached label counts and email lists after this bot changed the mailbox"""
+        if self._labels_view is not None:
+            # Keep the rendered view so unchanged counts can still reuse its keyboard
+            self._labels_view = (float("-inf"),) + self._labels_view[1:]
+        self._emails_cache.clear()
+
+    async def _gmail_call(self, method_name: str, *args, **kwargs):
+        """
+        Run a GmailHandler method off the event loop.
+        A transport, auth or 5xx failure resets the handler and starts an exponential cooldown
+        (2, 4, ... up to TELEGRAM_GMAIL_MAX_BACKOFF seconds) during which calls raise _GmailCoolingDown.
+        Other errors are re-raised without touching the cooldown.
+        """
+        self._check_gmail_cooldown()
+        try:
+            gmail_handler = await self._get_gmail()
+            result = await asyncio.to_thread(getattr(gmail_handler, method_name), *args, **kwargs)
+        except _GmailCoolingDown:
+            raise
+        except Exception as e:
+            if not _is_gmail_outage(e):
+                raise
+            self._gmail_failures += 1
+            backoff = min(2 ** self._gmail_failures, TELEGRAM_GMAIL_MAX_BACKOFF)
+            self._gmail_cooldown_until = time.monotonic() + backoff
+            self._reset_gmail()
+            raise
+        self._gmail_failures = 0
+        return result
+
+    @_authorized_only
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
-        # Check if user is authorized
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         # If no arguments, show options
         if not context.args:
             keyboard = [
@@ -71,6 +273,7 @@ class TelegramBotHandler:
         result = start_agent(mode=mode)
         
         if result["success"]:
+            self._labels_view = None
             if mode == "backfill":
                 await message_obj.reply_text(
                     "🚀 *Starting 24h Backfill*\n\n"
@@ -87,30 +290,23 @@ class TelegramBotHandler:
         else:
             await message_obj.reply_text(f"❌ {result['message']}")
     
+    @_authorized_only
     async def stop_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stop command"""
-        # Check if user is authorized
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
-        result = stop_agent()
+        result = await stop_agent()
         
         if result["success"]:
+            self._labels_view = None
             await update.message.reply_text(
-                "🛑 Email Agent Stopping...\n\n"
-                "The agent will stop after completing the current cycle."
+                "🛑 Email Agent Stopped\n\n"
+                "Agent stopped after finishing the current batch."
             )
         else:
             await update.message.reply_text(f"❌ {result['message']}")
     
+    @_authorized_only
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        # Check if user is authorized
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         status_info = get_agent_status()
         
         status_emoji = "🟢" if status_info["status"] == "Running" else "🔴"
@@ -122,72 +318,69 @@ class TelegramBotHandler:
             parse_mode="Markdown"
         )
     
+    @_authorized_only
     async def labels_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /labels command - show email categorization statistics with buttons"""
-        # Check if user is authorized
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         try:
-            # Get label statistics
-            gmail_handler = GmailHandler()
-            label_stats = gmail_handler.get_label_statistics()
-            
-            if not label_stats:
-                await update.message.reply_text("📊 No email labels found.")
-                return
-            
-            # Sort by count (descending)
-            sorted_stats = sorted(label_stats.items(), key=lambda x: x[1], reverse=True)
-            
-            # Build message
-            total_emails = sum(label_stats.values())
-            message = "📊 *Email Categorization Statistics*\n\n"
-            
-            # Create keyboard buttons
-            keyboard = []
-            row = []
-            
-            for i, (label_name, count) in enumerate(sorted_stats):
-                message += f"• {label_name}: *{count}* emails\n"
-                
-                # Add button for this label
-                # Callback data format: view:<label_name>
-                # Truncate label if too long for callback data (64 bytes limit)
-                callback_data = f"view:{label_name}"
-                if len(callback_data.encode('utf-8')) > 64:
-                    # If too long, we might need a different strategy or just not add button
-                    # For now, let's just try to add it, or maybe skip very long labels
-                    pass
+            # Label statistics and their keyboard are reused for TELEGRAM_LABEL_STATS_TTL seconds
+            view = self._labels_view
+            if view is None or time.monotonic() - view[0] >= TELEGRAM_LABEL_STATS_TTL:
+                label_stats = await self._gmail_call("get_label_statistics")
                 
-                from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-                row.append(InlineKeyboardButton(f"{label_name} ({count})", callback_data=callback_data))
+                if not label_stats:
+                    await update.message.reply_text("📊 No email labels found.")
+                    return
                 
-                # 2 buttons per row
-                if len(row) == 2:
-                    keyboard.append(row)
-                    row = []
-            
-            if row:
-                keyboard.append(row)
-                
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            message += f"\n📧 *Total:* {total_emails} categorized emails\n\n"
-            message += "👇 *Tap a button below to view emails:*"
-            
-            await update.message.reply_text(message, parse_mode="Markdown", reply_markup=reply_markup)
+                if view is not None and view[1] == label_stats:
+                    # Counts unchanged since the last render: keep the same message and keyboard objects
+                    message, reply_markup = view[2], view[3]
+                else:
+                    message, reply_markup = self._render_label_stats(label_stats)
+                view = self._labels_view = (time.monotonic(), label_stats, message, reply_markup)
+            
+            await update.message.reply_text(view[2], parse_mode="Markdown", reply_markup=view[3])
+        except _GmailCoolingDown as e:
+            await update.message.reply_text(f"⏳ {e}")
         except Exception as e:
             await update.message.reply_text(f"❌ Error fetching label statistics: {str(e)}")
     
+    def _render_label_stats(self, label_stats):
+        """Build the /labels message text and its view buttons from {label name: count}"""
+        # Largest labels first; Telegram keyboards only fit so many buttons
+        sorted_stats = nlargest(TELEGRAM_MAX_LABEL_BUTTONS, label_stats.items(), key=itemgetter(1))
+        
+        # Build message
+        total_emails = sum(label_stats.values())
+        parts = ["📊 *Email Categorization Statistics*\n\n"]
+        parts.extend(f"• {label_name}: *{count}* emails\n" for label_name, count in sorted_stats)
+        
+        # One button per label, 2 per row.
+        # Callback data format: v:<short id>, which stays under Telegram's 64-byte limit for any label name
+        buttons = [
+            InlineKeyboardButton(f"{label_name} ({count})", callback_data=f"v:{self._label_short_id(label_name)}")
+            for label_name, count in sorted_stats
+        ]
+        keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        
+        hidden = len(label_stats) - len(sorted_stats)
+        if hidden:
+            parts.append(f"_…and {hidden} smaller labels_\n")
+        parts.append(f"\n📧 *Total:* {total_emails} categorized emails\n\n")
+        parts.append("👇 *Tap a button below to view emails:*")
+        message = "".join(parts)
+        
+        return message, reply_markup
+    
+    def _label_short_id(self, label_name: str) -> str:
+        """Short id for a label's view button, hashed from its name so buttons stay valid across restarts"""
+        short_id = hashlib.blake2b(label_name.encode('utf-8'), digest_size=6).hexdigest()
+        self._label_names_by_id[short_id] = label_name
+        return short_id
+    
+    @_authorized_only
     async def view_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /view command - show emails for a specific label"""
-        # Check if user is authorized
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         # Check if label name was provided
         if not context.args:
             await update.message.reply_text(
@@ -202,133 +395,118 @@ class TelegramBotHandler:
         label_name = " ".join(context.args)
         await self.show_emails_for_label(update, label_name)
 
+    @_authorized_only
     async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle callback queries from inline buttons"""
         query = update.callback_query
-        await query.answer() # Acknowledge the callback
-        
-        # Check authorization
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await query.message.reply_text("⛔ Unauthorized access")
-            return
+        # Acknowledge the callback while the action runs instead of before it
+        answer_task = asyncio.create_task(query.answer())
+        try:
+            await self._dispatch_callback(update, query)
+        finally:
+            await answer_task
+
+    async def _dispatch_callback(self, update: Update, query):
+        """Route a callback query to the handler for its data prefix"""
+        prefix, _, arg = query.data.partition(":")
+        handler = self._callback_handlers.get(prefix)
+        if handler:
+            await handler(update, arg)
 
-        data = query.data
-        if data.startswith("start:"):
-            mode = data.split(":", 1)[1]
-            await self._perform_start(query.message, mode)
-        elif data.startswith("view:"):
-            label_name = data.split(":", 1)[1]
-            await self.show_emails_for_label(update, label_name)
-        elif data.startswith("reply:"):
-            msg_id = data.split(":", 1)[1]
-            await self.handle_reply_callback(update, msg_id)
-        elif data.startswith("send:"):
-            draft_id = data.split(":", 1)[1]
-            await self.handle_send_callback(update, draft_id)
-        elif data.startswith("regenerate:"):
-            msg_id = data.split(":", 1)[1]
-            await self.handle_regenerate_callback(update, msg_id)
-        elif data.startswith("cancel:"):
-            await self.handle_cancel_callback(update)
-        elif data.startswith("edit:"):
-            await self.handle_edit_callback(update)
+    async def _start_callback(self, update: Update, mode: str):
+        """Handle a startup mode button from /start"""
+        await self._perform_start(update.callback_query.message, mode)
+
+    async def _view_label_callback(self, update: Update, short_id: str):
+        """Handle a label button from /labels"""
+        label_name = self._label_names_by_id.get(short_id)
+        if label_name is None:
+            # Button from before a restart: match its id against the current label names
+            try:
+                labels = await self._gmail_call("get_labels", raise_errors=True)
+            except _GmailCoolingDown as e:
+                await update.callback_query.message.reply_text(f"⏳ {e}")
+                return
+            except Exception as e:
+                await update.callback_query.message.reply_text(f"❌ Error fetching labels: {str(e)}")
+                return
+            for label in labels:
+                self._label_short_id(label['name'])
+            label_name = self._label_names_by_id.get(short_id)
+        if label_name is None:
+            await update.callback_query.message.reply_text("⌛ This button has expired. Use /labels to get a fresh list.")
+            return
+        await self.show_emails_for_label(update, label_name)
 
+    async def _fetch_label_emails(self, label_name: str):
+        """
+        Recent emails for a label, reused for TELEGRAM_LABEL_EMAILS_TTL seconds.
+        Concurrent taps on the same label share a single in-flight Gmail fetch.
+        """
+        key = label_name.lower()
+        cached = self._emails_cache.get(key)
+        if cached and time.monotonic() - cached[0] < TELEGRAM_LABEL_EMAILS_TTL:
+            return cached[1]
+        
+        inflight = self._emails_inflight.get(key)
+        if inflight is None:
+            inflight = self._emails_inflight[key] = asyncio.ensure_future(self._load_label_emails(key, label_name))
+        # shield: one caller giving up must not cancel the fetch other callers are waiting on
+        return await asyncio.shield(inflight)
+    
+    async def _load_label_emails(self, key: str, label_name: str):
+        """Fetch a label's emails off the event loop, render them and cache the _LabelEmailsView"""
+        try:
+            emails = await self._gmail_call("get_emails_by_label", label_name, max_results=10)
+            if emails is None:
+                return None
+            # One numbered reply button per email, 5 per row
+            buttons = [
+                InlineKeyboardButton(f"↩️ {i}", callback_data=f"reply:{email.get('id')}")
+                for i, email in enumerate(emails, 1)
+            ]
+            view = _LabelEmailsView(
+                len(emails),
+                "\n\n".join(_email_card(i, email) for i, email in enumerate(emails, 1)),
+                InlineKeyboardMarkup([buttons[i:i + 5] for i in range(0, len(buttons), 5)])
+            )
+            self._emails_cache[key] = (time.monotonic(), view)
+            return view
+        finally:
+            self._emails_inflight.pop(key, None)
+    
     async def show_emails_for_label(self, update: Update, label_name: str):
         """Helper to fetch and show emails for a label"""
         try:
-            # Get emails for this label
-            gmail_handler = GmailHandler()
-            emails = gmail_handler.get_emails_by_label(label_name, max_results=10)
+            # Get emails for this label, already rendered
+            view = await self._fetch_label_emails(label_name)
             
             # Determine where to reply (message or callback query message)
             message_obj = update.message if update.message else update.callback_query.message
             
-            if emails is None:
+            if view is None:
                 await message_obj.reply_text(f"❌ Label '{label_name}' not found.")
                 return
             
-            if not emails:
+            if not view.count:
                 await message_obj.reply_text(f"📭 No emails found for label '{label_name}'.")
                 return
             
-            # Build message with email details
-            message = f"📬 *Emails in '{label_name}'* (showing {len(emails)})\n\n"
-            
-            for i, email in enumerate(emails, 1):
-                subject = email.get('subject', '(No Subject)')[:60]
-                sender = email.get('from', '(Unknown)')[:40]
-                snippet = email.get('snippet', '')[:100]
-                
-                # Escape markdown characters in content if needed, but for now simple replacement
-                # To be safe with Markdown parse mode, we should be careful. 
-                # Let's just use simple formatting.
-                
-                message += f"*{i}. {subject}*\n"
-                message += f"   From: {sender}\n"
-                message += f"   {snippet}...\n\n"
-                
-                # Add Reply button for each email
-                # We need a way to identify the email. Using index is risky if list changes.
-                # Using msg_id is better but might be long.
-                # Let's use a short ID mapping or just try to use the ID.
-                # Gmail IDs are usually hex strings.
-                
-                # For simplicity in this view, we might not be able to put buttons *inline* with text easily 
-                # if we are sending one big message.
-                # The user asked for "add a reply button".
-                # If we send one message per email, we can add buttons.
-                # But we are sending a list.
-                
-                # Alternative: "Reply to #1", "Reply to #2" buttons at the bottom?
-                # Or change to send individual cards for emails?
-                # Sending individual cards is better for interaction.
-                
-            # Let's change strategy: Send individual messages for the top 5 emails to allow interaction.
-            # The previous code sent one big message.
-            
-            await message_obj.reply_text(f"📬 *Emails in '{label_name}'* (showing {len(emails)})", parse_mode="Markdown")
-            
-            from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-            
-            for i, email in enumerate(emails, 1):
-                subject = email.get('subject', '(No Subject)')
-                sender = email.get('from', '(Unknown)')
-                snippet = email.get('snippet', '')
-                msg_id = email.get('id')
-                thread_id = email.get('threadId')
-                
-                text = f"*{i}. {subject}*\nFrom: {sender}\n{snippet}..."
-                
-                # Button to reply
-                keyboard = [[InlineKeyboardButton("↩️ Reply", callback_data=f"reply:{msg_id}")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await message_obj.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
-                
-            return # Stop here, don't send the big message
-            
-            # Legacy code below (commented out/removed by replacement)
-            # message += f"*{i}. {subject}*\n"
-            # ...
-            
-            # Telegram has a message length limit
-            if len(message) > 4000:
-                chunks = [message[i:i+4000] for i in range(0, len(message), 4000)]
-                for chunk in chunks:
-                    await message_obj.reply_text(chunk, parse_mode="Markdown")
-            else:
-                await message_obj.reply_text(message, parse_mode="Markdown")
+            # One message for the whole list, with a numbered reply button per email
+            header = f"📬 *Emails in '{_escape_md(label_name)}'* \\(showing {view.count}\\)"
+            await _reply_chunked(
+                message_obj, f"{header}\n\n{view.text}",
+                reply_markup=view.reply_markup, parse_mode="MarkdownV2"
+            )
+        except _GmailCoolingDown as e:
+            await update.effective_message.reply_text(f"⏳ {e}")
         except Exception as e:
             message_obj = update.message if update.message else update.callback_query.message
             await message_obj.reply_text(f"❌ Error fetching emails: {str(e)}")
     
+    @_authorized_only
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
-        # Check if user is authorized
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         help_text = (
             "🤖 *Email Agent Bot Commands*\n\n"
             "*Agent Control:*\n"
@@ -364,12 +542,13 @@ class TelegramBotHandler:
         self.application.add_handler(CommandHandler("insights", self.insights_command))
         self.application.add_handler(CommandHandler("stats", self.stats_command))
         
-        # Add callback query handler for inline buttons
-        from telegram.ext import CallbackQueryHandler
-        self.application.add_handler(CallbackQueryHandler(self.handle_callback_query))
+        # Add callback query handler for inline buttons; unknown callback prefixes are dropped by the dispatcher
+        pattern = "^(" + "|".join(map(re.escape, self._callback_handlers)) + "):"
+        self.application.add_handler(CallbackQueryHandler(self.handle_callback_query, pattern=pattern))
         
-        # Add message handler for text input (for instructions)
-        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
+        # Add message handler for text input (for instructions); other chats' text never reaches it
+        authorized_chat = filters.Chat(chat_id=self._authorized_chat_id_int)
+        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & authorized_chat, self.handle_message))
     
     async def handle_reply_callback(self, update: Update, msg_id: str):
         """Handle reply button click - generate draft"""
@@ -377,36 +556,61 @@ class TelegramBotHandler:
         await query.message.reply_text("⏳ Generating draft reply...")
         
         try:
-            gmail_handler = GmailHandler()
-            email_details = gmail_handler.get_email_details(msg_id)
+            email_details = await self._gmail_call("get_email_details", msg_id, raise_errors=True)
             
             if not email_details:
                 await query.message.reply_text("❌ Could not fetch email details.")
                 return
             
             # Generate draft
-            if self.categorizer:
-                email_content = f"Subject: {email_details['subject']}\nFrom: {email_details['from']}\n\n{email_details['snippet']}"
-                draft_body = self.categorizer.generate_reply(email_content)
-            else:
-                draft_body = "Error: LLM not initialized."
+            draft_body = await self._generate_reply(msg_id, email_details=email_details)
             
-            # Store draft
+            # Store draft; the original email stays in Gmail and is re-fetched if the draft is regenerated
             chat_id = update.effective_chat.id
             self.drafts[chat_id] = {
                 'msg_id': msg_id,
                 'thread_id': email_details.get('threadId'),
                 'to': email_details['from'],
                 'subject': f"Re: {email_details['subject']}",
-                'body': draft_body,
-                'original_content': email_content
+                'body': draft_body
             }
             
             await self.show_draft(update, chat_id)
             
+        except _GmailCoolingDown as e:
+            await query.message.reply_text(f"⏳ {e}")
         except Exception as e:
             await query.message.reply_text(f"❌ Error generating draft: {e}")
 
+    async def _generate_reply(self, msg_id: str, instructions: str = "", email_details=None):
+        """
+        Draft a reply with the LLM, reusing the last draft written for the same email and instructions.
+        The email is fetched from Gmail only if the draft isn't cached and email_details wasn't passed.
+        """
+        if not self.categorizer:
+            return "Error: LLM not initialized."
+        
+        key = (msg_id, hashlib.blake2b(instructions.encode("utf-8"), digest_size=8).hexdigest())
+        body = self._reply_cache.get(key)
+        if body is not None:
+            self._reply_cache.move_to_end(key)
+            return body
+        
+        if email_details is None:
+            email_details = await self._gmail_call("get_email_details", msg_id, raise_errors=True)
+            if not email_details:
+                raise RuntimeError("could not fetch the original email")
+        email_content = f"Subject: {email_details['subject']}\nFrom: {email_details['from']}\n\n{email_details['snippet']}"
+        
+        # The LLM call takes seconds; keep it off the event loop so other updates are served meanwhile
+        body = await asyncio.to_thread(self.categorizer.generate_reply, email_content, instructions)
+        # generate_reply reports failures as this text; don't pin it
+        if body != "Error generating reply.":
+            self._reply_cache[key] = body
+            if len(self._reply_cache) > TELEGRAM_REPLY_CACHE_SIZE:
+                self._reply_cache.popitem(last=False)
+        return body
+
     async def show_draft(self, update: Update, chat_id: int):
         """Show the current draft with action buttons"""
         draft = self.drafts.get(chat_id)
@@ -420,7 +624,6 @@ class TelegramBotHandler:
             f"👇 *Actions:*"
         )
         
-        from telegram import InlineKeyboardButton, InlineKeyboardMarkup
         keyboard = [
             [InlineKeyboardButton("🚀 Send", callback_data=f"send:{draft['msg_id']}")],
             [InlineKeyboardButton("✏️ Edit", callback_data=f"edit:{draft['msg_id']}")],
@@ -430,10 +633,8 @@ class TelegramBotHandler:
         reply_markup = InlineKeyboardMarkup(keyboard)
         
         # If called from callback, use query.message, else use update.message
-        if update.callback_query:
-            await update.callback_query.message.reply_text(message_text, parse_mode="Markdown", reply_markup=reply_markup)
-        else:
-            await update.message.reply_text(message_text, parse_mode="Markdown", reply_markup=reply_markup)
+        message_obj = update.callback_query.message if update.callback_query else update.message
+        await _reply_chunked(message_obj, message_text, reply_markup=reply_markup, parse_mode="Markdown")
 
     async def handle_send_callback(self, update: Update, draft_id: str):
         """Handle send button click"""
@@ -445,15 +646,21 @@ class TelegramBotHandler:
             return
         
         try:
-            gmail_handler = GmailHandler()
-            gmail_handler.send_reply(
+            sent = await self._gmail_call(
+                "send_reply",
                 thread_id=draft['thread_id'],
                 to=draft['to'],
                 subject=draft['subject'],
                 body=draft['body']
             )
+            if not sent:
+                await update.callback_query.message.reply_text("❌ Error sending reply. Please try again.")
+                return
+            self._invalidate_label_caches()
             await update.callback_query.message.reply_text("✅ Reply sent successfully!")
-            del self.drafts[chat_id] # Clear draft
+            self.drafts.pop(chat_id, None) # Clear draft
+        except _GmailCoolingDown as e:
+            await update.callback_query.message.reply_text(f"⏳ {e}")
         except Exception as e:
             await update.callback_query.message.reply_text(f"❌ Error sending reply: {e}")
 
@@ -465,16 +672,14 @@ class TelegramBotHandler:
             "⌨️ Please reply to this message with instructions for the reply (e.g., 'Make it more formal', 'Decline politely')."
         )
 
-    async def handle_cancel_callback(self, update: Update):
+    async def handle_cancel_callback(self, update: Update, _arg: str = ""):
         """Handle cancel button click"""
         chat_id = update.effective_chat.id
-        if chat_id in self.drafts:
-            del self.drafts[chat_id]
-        if chat_id in self.user_states:
-            del self.user_states[chat_id]
+        self.drafts.pop(chat_id, None)
+        self.user_states.pop(chat_id, None)
         await update.callback_query.message.reply_text("❌ Reply cancelled.")
 
-    async def handle_edit_callback(self, update: Update):
+    async def handle_edit_callback(self, update: Update, _arg: str = ""):
         """Handle edit button click - ask for new content"""
         chat_id = update.effective_chat.id
         draft = self.drafts.get(chat_id)
@@ -488,6 +693,7 @@ class TelegramBotHandler:
             "The current draft will be replaced with your message."
         )
 
+    @_authorized_only
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages (for instructions)"""
         chat_id = update.effective_chat.id
@@ -500,22 +706,24 @@ class TelegramBotHandler:
             
             if not draft or draft['msg_id'] != msg_id:
                 await update.message.reply_text("❌ Draft context lost. Please start over.")
-                del self.user_states[chat_id]
+                self.user_states.pop(chat_id, None)
                 return
             
             await update.message.reply_text("⏳ Regenerating draft...")
             
             try:
                 # Regenerate with instructions
-                new_body = self.categorizer.generate_reply(draft['original_content'], instructions)
+                new_body = await self._generate_reply(msg_id, instructions)
                 draft['body'] = new_body
                 self.drafts[chat_id] = draft # Update draft
                 
                 # Clear state
-                del self.user_states[chat_id]
+                self.user_states.pop(chat_id, None)
                 
                 # Show updated draft
                 await self.show_draft(update, chat_id)
+            except _GmailCoolingDown as e:
+                await update.message.reply_text(f"⏳ {e}")
             except Exception as e:
                 await update.message.reply_text(f"❌ Error regenerating draft: {e}")
         
@@ -526,7 +734,7 @@ class TelegramBotHandler:
             
             if not draft or draft['msg_id'] != msg_id:
                 await update.message.reply_text("❌ Draft context lost. Please start over.")
-                del self.user_states[chat_id]
+                self.user_states.pop(chat_id, None)
                 return
             
             # Update draft with manual edit
@@ -534,7 +742,7 @@ class TelegramBotHandler:
             self.drafts[chat_id] = draft
             
             # Clear state
-            del self.user_states[chat_id]
+            self.user_states.pop(chat_id, None)
             
             # Show updated draft
             await self.show_draft(update, chat_id)
@@ -542,12 +750,9 @@ class TelegramBotHandler:
             # Ignore other messages or handle as unknown command
             pass
     
+    @_authorized_only
     async def analytics_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /analytics command - show comprehensive analytics dashboard"""
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         if not self.analytics_engine:
             await update.message.reply_text("❌ Analytics not available (LLM not configured)")
             return
@@ -584,20 +789,26 @@ class TelegramBotHandler:
                 f"• Offer Rate: {success['offer_rate']}%\n"
             )
             
-            await update.message.reply_text(message, parse_mode="Markdown")
+            # Render both charts in parallel in the chart process pool while the dashboard is sent
+            show_funnel = success['applications'] > 0 or success['interviews'] > 0
+            chart_jobs = [self.analytics_visualizer.generate_category_pie_chart_async(days)]
+            if show_funnel:
+                chart_jobs.append(self.analytics_visualizer.generate_success_metrics_chart_async(days))
+            sent, *charts = await asyncio.gather(
+                update.message.reply_text(message, parse_mode="Markdown"),
+                *chart_jobs,
+                return_exceptions=True
+            )
+            if isinstance(sent, Exception):
+                raise sent
             
-            # Generate and send charts
+            # Send charts
             try:
-                # Category pie chart
-                pie_chart = self.analytics_visualizer.generate_category_pie_chart(days)
-                with open(pie_chart, 'rb') as photo:
-                    await update.message.reply_photo(photo, caption=f"Category Distribution ({days} days)")
-                
-                # Success funnel
-                if success['applications'] > 0 or success['interviews'] > 0:
-                    funnel_chart = self.analytics_visualizer.generate_success_metrics_chart(days)
-                    with open(funnel_chart, 'rb') as photo:
-                        await update.message.reply_photo(photo, caption=f"Success Funnel ({days} days)")
+                for chart, title in zip(charts, ("Category Distribution", "Success Funnel")):
+                    if isinstance(chart, Exception):
+                        raise chart
+                    with open(chart, 'rb') as photo:
+                        await update.message.reply_photo(photo, caption=f"{title} ({days} days)")
                 
                 # Cleanup old charts
                 self.analytics_visualizer.cleanup_old_charts()
@@ -607,12 +818,9 @@ class TelegramBotHandler:
         except Exception as e:
             await update.message.reply_text(f"❌ Error generating analytics: {str(e)}")
     
+    @_authorized_only
     async def trends_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /trends command - show email volume trends"""
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         if not self.analytics_visualizer:
             await update.message.reply_text("❌ Analytics not available (LLM not configured)")
             return
@@ -623,14 +831,15 @@ class TelegramBotHandler:
             if context.args and context.args[0].isdigit():
                 days = int(context.args[0])
             
-            await update.message.reply_text(f"📈 Generating trends for last {days} days...")
-            
             # Get trend data
             trends = self.analytics_engine.get_email_volume_trends(days)
             
-            # Generate charts
-            volume_chart = self.analytics_visualizer.generate_volume_trend_chart(days)
-            stacked_chart = self.analytics_visualizer.generate_stacked_area_chart(days)
+            # Generate charts while the progress message is on its way
+            _, volume_chart, stacked_chart = await asyncio.gather(
+                update.message.reply_text(f"📈 Generating trends for last {days} days..."),
+                self.analytics_visualizer.generate_volume_trend_chart_async(days),
+                self.analytics_visualizer.generate_stacked_area_chart_async(days)
+            )
             
             # Send charts
             with open(volume_chart, 'rb') as photo:
@@ -649,12 +858,9 @@ class TelegramBotHandler:
         except Exception as e:
             await update.message.reply_text(f"❌ Error generating trends: {str(e)}")
     
+    @_authorized_only
     async def insights_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /insights command - show AI-generated insights"""
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         if not self.analytics_engine:
             await update.message.reply_text("❌ Analytics not available (LLM not configured)")
             return
@@ -668,24 +874,21 @@ class TelegramBotHandler:
             await update.message.reply_text(f"🤖 Generating AI insights for last {days} days...")
             
             # Generate insights
-            insights = self.analytics_engine.generate_insights(days)
+            insights = await asyncio.to_thread(self.analytics_engine.generate_insights, days)
             
             message = (
                 f"💡 *AI-Generated Insights ({days} Days)*\n\n"
                 f"{insights}"
             )
             
-            await update.message.reply_text(message, parse_mode="Markdown")
+            await _reply_chunked(update.message, message, parse_mode="Markdown")
             
         except Exception as e:
             await update.message.reply_text(f"❌ Error generating insights: {str(e)}")
     
+    @_authorized_only
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command - show quick summary statistics"""
-        if str(update.effective_chat.id) != self.authorized_chat_id:
-            await update.message.reply_text("⛔ Unauthorized access")
-            return
-        
         if not self.analytics_engine:
             await update.message.reply_text("❌ Analytics not available (LLM not configured)")
             return
@@ -714,13 +917,24 @@ class TelegramBotHandler:
 
     async def start_bot(self):
         """Start the Telegram bot"""
-        self.application = Application.builder().token(self.token).build()
+        # Handlers run concurrently; AIORateLimiter paces every outgoing call under Telegram's limits
+        self.application = (
+            Application.builder()
+            .token(self.token)
+            .concurrent_updates(True)
+            .rate_limiter(AIORateLimiter(overall_max_rate=TELEGRAM_MAX_MESSAGES_PER_SECOND, max_retries=3))
+            .build()
+        )
         self.setup_handlers()
         
         # Start polling in the background
         await self.application.initialize()
         await self.application.start()
-        await self.application.updater.start_polling()
+        # Long polls hold each getUpdates open for up to TELEGRAM_POLL_TIMEOUT seconds while idle
+        await self.application.updater.start_polling(
+            timeout=TELEGRAM_POLL_TIMEOUT,
+            allowed_updates=[Update.MESSAGE, Update.CALLBACK_QUERY]
+        )
         
         print("[OK] Telegram bot started and listening for commands...")
     
@@ -734,10 +948,14 @@ class TelegramBotHandler:
 
 # Global bot instance
 bot_handler = None
+_bot_lock = threading.Lock()
 
 def get_bot_handler():
     """Get or create the bot handler instance"""
     global bot_handler
     if bot_handler is None:
-        bot_handler = TelegramBotHandler(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+        # Two handlers would mean two getUpdates pollers fighting over the same bot token
+        with _bot_lock:
+            if bot_handler is None:
+                bot_handler = TelegramBotHandler(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
     return bot_handler
@@ -1,25 +1,29 @@
 """
 Test script to debug agent start/stop behavior
 """
-import time
-from src.agent_controller import start_agent, get_agent_status
+import asyncio
+from src.agent_controller import start_agent, get_agent_status, wait_for_agent, add_run_listener
 
-print("=" * 50)
-print("Testing Agent Start with Backfill Mode")
-print("=" * 50)
+async def main():
+    print("=" * 50)
+    print("Testing Agent Start with Backfill Mode")
+    print("=" * 50)
 
-# Start agent
-result = start_agent(mode="backfill")
-print(f"\nStart result: {result}")
+    # Report each processing run as it starts instead of polling the status
+    add_run_listener(lambda last_run: print(f"Run started at {last_run}"))
 
-# Monitor status
-for i in range(20):  # Check for 20 seconds
-    time.sleep(1)
-    status = get_agent_status()
-    print(f"[{i+1}s] Status: {status['status']}, Last Run: {status['last_run']}")
-    
-    if status['status'] == 'Stopped':
+    # Start agent (runs as a task on this event loop)
+    result = start_agent(mode="backfill")
+    print(f"\nStart result: {result}")
+
+    # Watch for 20 seconds; returns as soon as the agent task ends
+    if await wait_for_agent(timeout=20):
         print("\n⚠️ Agent stopped unexpectedly!")
-        break
+    else:
+        print("\n[OK] Agent still running after 20s")
+
+    status = get_agent_status()
+    print(f"Status: {status['status']}, Last Run: {status['last_run']}")
+    print("\n" + "=" * 50)
 
-print("\n" + "=" * 50)
+asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Test that a fallback ('uncategorized') classification is not reused from the classification cache
+"""
+import os
+import tempfile
+from src.agent import GmailLLMAgent
+from src.analytics_db import AnalyticsDB
+
+
+class FlakyCategorizer:
+    """Fails (falls back to 'uncategorized') on the first call, then answers properly"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def categorize_batch(self, emails):
+        self.calls += 1
+        for email in emails:
+            if self.calls == 1:
+                email["category"], email["category_label"] = "uncategorized", "Other 📧"
+            else:
+                email["category"], email["category_label"] = "follow_up", "Follow Up 🔄"
+        return emails
+
+
+def _email():
+    return {'id': 'msg-1', 'from': 'recruiter@example.com', 'subject': 'Next steps', 'snippet': 'Hi there'}
+
+
+def test_fallback_classification_not_reused():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = AnalyticsDB(db_path=os.path.join(tmp, "analytics.db"))
+        agent = GmailLLMAgent.__new__(GmailLLMAgent)
+        agent.analytics_db = db
+        agent.categorizer = FlakyCategorizer()
+        agent.IMPORTANT_CATEGORIES = ["follow_up"]
+
+        first = agent._categorize_with_cache([_email()])
+        assert first[0]["category"] == "uncategorized"
+
+        # The same email must be sent to the LLM again rather than served the fallback
+        second = agent._categorize_with_cache([_email()])
+        assert agent.categorizer.calls == 2, "fallback classification was served from the cache"
+        assert second[0]["category"] == "follow_up"
+
+        # A real classification is cached and reused
+        third = agent._categorize_with_cache([_email()])
+        assert agent.categorizer.calls == 2
+        assert third[0]["category"] == "follow_up"
+        db.close()
+    print("✓ Fallback classifications are not reused from the cache")
+
+
+if __name__ == "__main__":
+    test_fallback_classification_not_reused()